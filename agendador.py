@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import re
+import threading
+import time
+
+DURATION_RE = re.compile(r'^(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+(?:\.\d+)?)s?)?$')
+
+def parse_duration(text):
+    # "90", "90s", "1m30s", "2h" -> segundos
+    match = DURATION_RE.match(text.strip().lower())
+    if not match or not any(match.groups()):
+        raise ValueError(f"Duracao invalida: {text}")
+    hours, minutes, seconds = match.groups()
+    total = int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+    if total <= 0:
+        raise ValueError("Duracao deve ser maior que zero")
+    return total
+
+class ScheduledEntry:
+    def __init__(self, entry_id, name, kind, due=None, interval=None):
+        self.id = entry_id
+        self.name = name
+        self.kind = kind
+        self.due = due
+        self.interval = interval
+        self.started = time.monotonic()
+        self.stopped = None
+        self.fired = 0
+        self.active = True
+
+    def remaining(self, now=None):
+        if self.due is None or not self.active:
+            return None
+        return max(self.due - (now or time.monotonic()), 0)
+
+    def elapsed(self, now=None):
+        return (self.stopped or now or time.monotonic()) - self.started
+
+class TimerScheduler:
+    def __init__(self, on_fire=None):
+        self.on_fire = on_fire
+        self.entries = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="agendador")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _schedule(self, entry):
+        heapq.heappush(self._heap, (entry.due, entry.id))
+        # Acorda a thread: a nova entrada pode vencer antes da que ela aguardava
+        self._condition.notify()
+
+    def add_timer(self, name, seconds):
+        return self._add(name, 'timer', seconds, None)
+
+    def add_reminder(self, name, interval):
+        return self._add(name, 'lembrete', interval, interval)
+
+    def _add(self, name, kind, seconds, interval):
+        with self._condition:
+            entry = ScheduledEntry(next(self._ids), name, kind, time.monotonic() + seconds, interval)
+            self.entries[entry.id] = entry
+            self._ensure_thread()
+            self._schedule(entry)
+            return entry
+
+    def add_stopwatch(self, name):
+        # Cronômetros não vencem: ficam fora do heap e só guardam o início
+        with self._condition:
+            entry = ScheduledEntry(next(self._ids), name, 'cronometro')
+            self.entries[entry.id] = entry
+            return entry
+
+    def stop(self, entry_id):
+        with self._condition:
+            entry = self.entries.get(entry_id)
+            if entry is None or not entry.active:
+                return None
+            entry.active = False
+            entry.stopped = time.monotonic()
+            # A entrada no heap fica para trás e é ignorada quando chegar a vez dela
+            self._condition.notify()
+            return entry
+
+    def remove_finished(self):
+        with self._condition:
+            for entry_id in [entry_id for entry_id, entry in self.entries.items() if not entry.active]:
+                del self.entries[entry_id]
+
+    def snapshot(self):
+        with self._condition:
+            return list(self.entries.values())
+
+    def active_count(self):
+        with self._condition:
+            return sum(1 for entry in self.entries.values() if entry.active)
+
+    def _run(self):
+        while True:
+            fired = []
+            with self._condition:
+                while True:
+                    # Descarta do topo entradas canceladas ou reagendadas
+                    while self._heap:
+                        due, entry_id = self._heap[0]
+                        entry = self.entries.get(entry_id)
+                        if entry is not None and entry.active and entry.due == due:
+                            break
+                        heapq.heappop(self._heap)
+
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    break
+
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    due, entry_id = heapq.heappop(self._heap)
+                    entry = self.entries.get(entry_id)
+                    if entry is None or not entry.active or entry.due != due:
+                        continue
+                    entry.fired += 1
+                    if entry.interval:
+                        # Próximo disparo a partir do previsto, não de agora: sem deriva
+                        entry.due = due + entry.interval
+                        if entry.due <= now:
+                            entry.due = now + entry.interval
+                        heapq.heappush(self._heap, (entry.due, entry.id))
+                    else:
+                        entry.active = False
+                        entry.stopped = now
+                    fired.append(entry)
+
+            # Callback fora da trava: a interface pode consultar o agendador nele
+            for entry in fired:
+                if self.on_fire:
+                    try:
+                        self.on_fire(entry)
+                    except Exception:
+                        pass
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAX_LENGTH = 500
+MAX_EXPONENT = 10000
+MAX_FACTORIAL = 1000
+# Inteiros acima disso não podem nem ser exibidos (limite de 4300 dígitos do Python)
+MAX_INT_BITS = 14000
+MAX_BATCH = 1000000
+
+ASSIGNMENT_RE = re.compile(r'^\s*([A-Za-z_]\w*)\s*=(?!=)\s*(.+)$')
+
+class CalcError(ValueError):
+    pass
+
+def _check_bits(bits):
+    if bits > MAX_INT_BITS:
+        raise CalcError(f"Resultado inteiro maior que {MAX_INT_BITS} bits")
+
+def _pow(base, exponent):
+    # Inteiros enormes travariam o processo; floats apenas estouram
+    if isinstance(exponent, (int, float)) and abs(exponent) > MAX_EXPONENT:
+        raise CalcError(f"Expoente maior que {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        # Limite sobre o tamanho do resultado, estimado antes de calcular:
+        # uma base já enorme com expoente pequeno também trava
+        _check_bits(abs(base).bit_length() * exponent)
+    return operator.pow(base, exponent)
+
+def _mul(left, right):
+    if isinstance(left, int) and isinstance(right, int):
+        _check_bits(abs(left).bit_length() + abs(right).bit_length())
+    return operator.mul(left, right)
+
+def _factorial(value):
+    if value > MAX_FACTORIAL:
+        raise CalcError(f"Fatorial limitado a {MAX_FACTORIAL}")
+    return math.factorial(int(value))
+
+BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow
+}
+
+UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+FUNCTIONS = {
+    'sqrt': math.sqrt, 'exp': math.exp, 'log': math.log, 'log10': math.log10, 'log2': math.log2,
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan, 'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh, 'radians': math.radians, 'degrees': math.degrees,
+    'abs': abs, 'round': round, 'floor': math.floor, 'ceil': math.ceil, 'hypot': math.hypot,
+    'min': min, 'max': max, 'factorial': _factorial
+}
+
+# Equivalentes vetorizados; funções fora desta tabela caem no laço em Python
+NUMPY_FUNCTIONS = {}
+if numpy is not None:
+    NUMPY_FUNCTIONS = {
+        'sqrt': numpy.sqrt, 'exp': numpy.exp, 'log': numpy.log, 'log10': numpy.log10, 'log2': numpy.log2,
+        'sin': numpy.sin, 'cos': numpy.cos, 'tan': numpy.tan, 'asin': numpy.arcsin, 'acos': numpy.arccos,
+        'atan': numpy.arctan, 'sinh': numpy.sinh, 'cosh': numpy.cosh, 'tanh': numpy.tanh,
+        'radians': numpy.radians, 'degrees': numpy.degrees, 'abs': numpy.abs, 'round': numpy.round,
+        'floor': numpy.floor, 'ceil': numpy.ceil, 'hypot': numpy.hypot
+    }
+
+def _build(node, names, calls):
+    # Converte a árvore em closures aninhadas: avaliar não passa mais pelo ast
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalcError("Apenas numeros sao permitidos")
+        value = node.value
+        return lambda env, funcs: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda env, funcs: value
+        names.add(name)
+
+        def load(env, funcs):
+            try:
+                return env[name]
+            except KeyError:
+                raise CalcError(f"Variavel nao definida: {name}")
+        return load
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPS:
+        op = BINARY_OPS[type(node.op)]
+        left = _build(node.left, names, calls)
+        right = _build(node.right, names, calls)
+        return lambda env, funcs: op(left(env, funcs), right(env, funcs))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        op = UNARY_OPS[type(node.op)]
+        operand = _build(node.operand, names, calls)
+        return lambda env, funcs: op(operand(env, funcs))
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise CalcError(f"Funcao nao permitida: {ast.unparse(node.func)}")
+        name = node.func.id
+        calls.add(name)
+        args = [_build(arg, names, calls) for arg in node.args]
+        return lambda env, funcs: funcs[name](*(arg(env, funcs) for arg in args))
+
+    raise CalcError(f"Construcao nao permitida: {node.__class__.__name__}")
+
+class CompiledExpression:
+    def __init__(self, text):
+        if len(text) > MAX_LENGTH:
+            raise CalcError(f"Expressao maior que {MAX_LENGTH} caracteres")
+        try:
+            tree = ast.parse(text.replace('^', '**'), mode='eval')
+        except SyntaxError:
+            raise CalcError("Expressao invalida")
+
+        self.text = text
+        self.names = set()
+        self.calls = set()
+        self._evaluate = _build(tree.body, self.names, self.calls)
+        self.vectorizable = numpy is not None and self.calls <= set(NUMPY_FUNCTIONS)
+
+    def __call__(self, variables=None):
+        try:
+            return self._evaluate(variables or {}, FUNCTIONS)
+        except CalcError:
+            raise
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise CalcError(str(e) or e.__class__.__name__)
+
+    def evaluate_batch(self, name, values, variables=None):
+        env = dict(variables or {})
+        if self.vectorizable:
+            env[name] = numpy.asarray(values, dtype=float)
+            try:
+                with numpy.errstate(all='ignore'):
+                    result = self._evaluate(env, NUMPY_FUNCTIONS)
+            except CalcError:
+                raise
+            except (ArithmeticError, ValueError, TypeError) as e:
+                raise CalcError(str(e) or e.__class__.__name__)
+            # Expressão que não usa a variável devolve um escalar
+            return numpy.broadcast_to(result, env[name].shape).tolist(), 'numpy'
+
+        results = []
+        for value in values:
+            env[name] = value
+            try:
+                results.append(self._evaluate(env, FUNCTIONS))
+            except CalcError:
+                raise
+            except (ArithmeticError, ValueError, TypeError) as e:
+                results.append(f"erro: {e}")
+        return results, 'python'
+
+@lru_cache(maxsize=256)
+def compile_expression(text):
+    return CompiledExpression(text.strip())
+
+def parse_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and 'e' not in text.lower() and '.' not in text else value
+
+def parse_values(text):
+    # "1,2,5" (lista) ou "inicio:fim[:passo]" com fim incluído
+    text = text.strip()
+    if ':' in text:
+        try:
+            parts = [parse_number(part) for part in text.split(':')]
+        except ValueError:
+            raise CalcError("Faixa deve conter apenas numeros")
+        if len(parts) not in (2, 3):
+            raise CalcError("Faixa deve ser inicio:fim ou inicio:fim:passo")
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) == 3 else 1
+        if step == 0 or (stop - start) / step < 0:
+            raise CalcError("Passo invalido para a faixa")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_BATCH:
+            raise CalcError(f"Faixa com mais de {MAX_BATCH} valores")
+        return [start + i * step for i in range(count)]
+    try:
+        return [parse_number(part) for part in text.split(',') if part.strip()]
+    except ValueError:
+        raise CalcError("Valores devem ser numeros separados por virgula")
+
+class Calculator:
+    def __init__(self):
+        self.variables = {}
+
+    def evaluate(self, line):
+        match = ASSIGNMENT_RE.match(line)
+        target, expression = match.groups() if match else ('ans', line)
+        if target in CONSTANTS or target in FUNCTIONS:
+            raise CalcError(f"Nome reservado: {target}")
+
+        result = compile_expression(expression)(self.variables)
+        self.variables[target] = result
+        if target != 'ans':
+            self.variables['ans'] = result
+        return target, result
+
+    def batch(self, name, values_text, expression):
+        if not name.isidentifier() or name in CONSTANTS or name in FUNCTIONS:
+            raise CalcError(f"Nome de variavel invalido: {name}")
+        values = parse_values(values_text)
+        results, mode = compile_expression(expression).evaluate_batch(name, values, self.variables)
+        return values, results, mode
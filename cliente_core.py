@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+from opcoes import parse_options
+
+PROMPT = "Digite um comando: "
+PROMPT_BYTES = PROMPT.encode('utf-8')
+QUIT_COMMANDS = ('quit', 'exit', 'bye', 'sair')
+
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+
+# Marca, na lista de eventos do framer, que o servidor terminou uma resposta
+PROMPT_EVENT = object()
+
+class ResponseFramer:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.scanned = 0
+
+    def feed(self, data):
+        # Linhas são separadas em bytes antes de decodificar: b'\n' nunca aparece
+        # dentro de um caractere UTF-8, então "ç" e "ã" não são cortados entre chunks
+        events = []
+        buffer = self.buffer
+        buffer += data
+        start = 0
+
+        while True:
+            if buffer.startswith(PROMPT_BYTES, start):
+                events.append(PROMPT_EVENT)
+                start += len(PROMPT_BYTES)
+                self.scanned = max(self.scanned, start)
+                continue
+
+            end = buffer.find(b'\n', max(start, self.scanned))
+            if end < 0:
+                self.scanned = len(buffer)
+                break
+
+            line_end = end - 1 if end > start and buffer[end - 1] == 13 else end
+            events.append(buffer[start:line_end].decode('utf-8', errors='replace'))
+            start = end + 1
+            self.scanned = start
+
+        if start:
+            del buffer[:start]
+            self.scanned -= start
+
+        return events
+
+    def flush(self):
+        if not self.buffer:
+            return []
+        line = self.buffer.decode('utf-8', errors='replace')
+        self.buffer = bytearray()
+        self.scanned = 0
+        return [line]
+
+class TelnetConnection:
+    def __init__(self):
+        self.sock = None
+        self.framer = ResponseFramer()
+
+    def connect(self, host, port, timeout=10):
+        self.close()
+        self.framer = ResponseFramer()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect((host, port))
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+    def send(self, command):
+        data = f"{command}\n".encode('utf-8')
+        self.sock.sendall(data)
+        return len(data)
+
+    def receive(self):
+        data = self.sock.recv(65536)
+        if not data:
+            return self.framer.flush() or None
+        return self.framer.feed(data)
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+class Backoff:
+    def __init__(self, base=0.5, cap=30.0, factor=2.0):
+        self.base = base
+        self.cap = cap
+        self.factor = factor
+        self.attempts = 0
+
+    def next_delay(self):
+        # Metade fixa, metade aleatória: clientes que caíram juntos não voltam juntos
+        delay = min(self.cap, self.base * self.factor ** self.attempts)
+        self.attempts += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempts = 0
+
+class AsyncTelnetClient:
+    def __init__(self, host='127.0.0.1', port=2323, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.framer = ResponseFramer()
+        self.pending = deque()
+        self.current = []
+        self.subscribers = []
+        self.reader_task = None
+        self.welcomed = False
+
+    @property
+    def connected(self):
+        return self.reader_task is not None and not self.reader_task.done()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        self.framer = ResponseFramer()
+        self.welcomed = False
+        welcome = asyncio.get_running_loop().create_future()
+        self.pending.append(welcome)
+        self.reader_task = asyncio.create_task(self._read_loop())
+        try:
+            return await asyncio.wait_for(welcome, self.timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            await self.close()
+            raise
+
+    async def execute(self, command, timeout=None):
+        if not self.connected:
+            raise ConnectionError("Nao conectado")
+
+        future = asyncio.get_running_loop().create_future()
+        # Fila e escrita no mesmo passo: a ordem das respostas segue a ordem de envio
+        self.pending.append(future)
+        self.writer.write(f"{command}\n".encode('utf-8'))
+        await self.writer.drain()
+        return await asyncio.wait_for(future, timeout or self.timeout)
+
+    async def stream(self):
+        queue = asyncio.Queue()
+        self.subscribers.append(queue)
+        try:
+            while True:
+                line = await queue.get()
+                if line is None:
+                    break
+                yield line
+        finally:
+            self.subscribers.remove(queue)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        if self.reader_task:
+            await asyncio.gather(self.reader_task, return_exceptions=True)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                for event in self.framer.feed(data):
+                    if event is PROMPT_EVENT:
+                        self.welcomed = True
+                        self._complete("\n".join(self.current))
+                        self.current = []
+                    else:
+                        self.current.append(event)
+                        for queue in self.subscribers:
+                            queue.put_nowait(event)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            for line in self.framer.flush():
+                self.current.append(line)
+                for queue in self.subscribers:
+                    queue.put_nowait(line)
+            if self.pending and not self.welcomed:
+                # Fechou antes do primeiro prompt (servidor cheio, recusa): falha no connect
+                text = "\n".join(self.current).strip()
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError(text or "Conexao encerrada antes do prompt"))
+            elif self.pending:
+                # Sem prompt no fim (ex.: quit): o que chegou é a resposta do pedido mais antigo
+                self._complete("\n".join(self.current))
+            self.current = []
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionError("Conexao encerrada pelo servidor"))
+            for queue in self.subscribers:
+                queue.put_nowait(None)
+
+    def _complete(self, response):
+        if self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_result(response)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values, low=None, high=None):
+    if not values:
+        return ""
+    low = min(values) if low is None else low
+    high = max(values) if high is None else high
+    span = (high - low) or 1
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(max(int((value - low) / span * top), 0), top)] for value in values)
+
+class LatencyHistogram:
+    # Buckets log-lineares em microssegundos (estilo HDR): 16 sub-buckets por
+    # potência de 2, ou seja, erro relativo máximo de ~6%
+    SUB_BUCKET_BITS = 4
+
+    def __init__(self, window=1000, recent=30):
+        self.window = deque(maxlen=window)
+        self.counts = {}
+        self.recent = deque(maxlen=recent)
+        self.total = 0
+
+    @classmethod
+    def bucket_index(cls, micros):
+        sub = 1 << cls.SUB_BUCKET_BITS
+        if micros < 2 * sub:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return shift * sub + (micros >> shift)
+
+    @classmethod
+    def bucket_value(cls, index):
+        sub = 1 << cls.SUB_BUCKET_BITS
+        if index < 2 * sub:
+            return index
+        shift = index // sub - 1
+        return ((index - shift * sub) << shift) + (1 << shift) // 2
+
+    def record(self, seconds):
+        index = self.bucket_index(max(int(seconds * 1000000), 0))
+        if len(self.window) == self.window.maxlen:
+            evicted = self.window[0]
+            self.counts[evicted] -= 1
+            if not self.counts[evicted]:
+                del self.counts[evicted]
+        self.window.append(index)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.recent.append(seconds * 1000)
+        self.total += 1
+
+    def __len__(self):
+        return len(self.window)
+
+    def percentile(self, percent):
+        if not self.window:
+            return 0.0
+        target = max(int(len(self.window) * percent / 100.0 + 0.5), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return self.bucket_value(index) / 1000.0
+        return self.bucket_value(max(self.counts)) / 1000.0
+
+    def summary(self):
+        return {
+            'count': self.total,
+            'window': len(self.window),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.percentile(100), 3),
+            'recent_ms': [round(value, 3) for value in self.recent]
+        }
+
+class LatencyTracker:
+    def __init__(self, window=1000):
+        self.window = window
+        self.histograms = {}
+
+    def record(self, command, seconds):
+        name = command.split()[0].lower() if command.strip() else command
+        for key in (name, '*'):
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram(self.window)
+            histogram.record(seconds)
+
+    def items(self):
+        return sorted(self.histograms.items(), key=lambda item: (item[0] == '*', item[0]))
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in self.items()}
+
+def strip_ansi(text):
+    return ANSI_RE.sub('', text)
+
+def response_failed(response):
+    return "não reconhecido" in response
+
+def iter_commands(stream):
+    for line in stream:
+        command = line.strip()
+        if command and not command.startswith('#'):
+            yield command
+
+async def _run_batch(host, port, commands, depth, output_format, timeout, out):
+    client = AsyncTelnetClient(host, port, timeout)
+    try:
+        await client.connect()
+    except (OSError, asyncio.TimeoutError) as e:
+        print(f"ERRO: Falha ao conectar em {host}:{port}: {str(e) or 'timeout'}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    in_flight = deque()
+
+    async def timed(command):
+        started = time.perf_counter()
+        try:
+            response = await client.execute(command, timeout)
+            ok = not response_failed(response)
+        except asyncio.TimeoutError:
+            response, ok = "ERRO: timeout", False
+        except ConnectionError as e:
+            response, ok = f"ERRO: {str(e) or type(e).__name__}", False
+        return command, strip_ansi(response).strip('\n'), (time.perf_counter() - started) * 1000, ok
+
+    def write(result):
+        command, response, elapsed, ok = result
+        if output_format == 'jsonl':
+            out.write(json.dumps({'command': command, 'response': response, 'ms': round(elapsed, 3), 'ok': ok}, ensure_ascii=False) + "\n")
+        else:
+            out.write(response + "\n")
+        out.flush()
+        return ok
+
+    loop = asyncio.get_running_loop()
+    iterator = iter(commands)
+    while True:
+        # Leitura em executor: stdin pode bloquear enquanto respostas chegam
+        command = await loop.run_in_executor(None, next, iterator, None)
+        if command is None or not client.connected:
+            break
+
+        in_flight.append(asyncio.create_task(timed(command)))
+        if command.lower() in QUIT_COMMANDS:
+            break
+        if len(in_flight) >= depth:
+            failures += not write(await in_flight.popleft())
+
+    while in_flight:
+        failures += not write(await in_flight.popleft())
+
+    await client.close()
+    return 3 if failures else 0
+
+def run_batch(argv):
+    # "--batch arquivo" continua valendo; "--batch" sozinho, no fim ou seguido
+    # do host lê os comandos da entrada padrão
+    argv = list(argv)
+    if '--batch' in argv:
+        i = argv.index('--batch')
+        following = argv[i + 1] if i + 1 < len(argv) else None
+        if following is not None and (following == '-' or os.path.isfile(following)):
+            argv[i:i + 2] = [f"--batch={following}"]
+    args, options = parse_options(argv, flags=('batch',))
+    if len(args) > 2:
+        print(f"ERRO: argumentos a mais: {' '.join(args[2:])} (arquivo de comandos inexistente?)", file=sys.stderr)
+        return 2
+
+    host = args[0] if args else options.get('host', '127.0.0.1')
+    try:
+        port = int(args[1] if len(args) > 1 else options.get('port', 2323))
+        depth = max(int(options.get('pipeline', 1)), 1)
+        timeout = float(options.get('timeout', 10))
+    except ValueError:
+        print("ERRO: porta, pipeline e timeout devem ser números", file=sys.stderr)
+        return 2
+
+    output_format = options.get('format', 'plain')
+    if output_format not in ('plain', 'jsonl'):
+        print("ERRO: --format deve ser 'plain' ou 'jsonl'", file=sys.stderr)
+        return 2
+
+    source = options.get('batch') or '-'
+    try:
+        stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    except OSError as e:
+        print(f"ERRO: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        return asyncio.run(_run_batch(host, port, iter_commands(stream), depth, output_format, timeout, sys.stdout))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def parse_target(text, default_port=2323):
+    host, sep, port = text.strip().rpartition(':')
+    if not sep:
+        return text.strip(), default_port
+    return host, int(port)
+
+def expand_targets(text, default_port=2323):
+    # "host:2323-2330, outro:2323" vira uma lista de (host, porta)
+    targets = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, ports = item.rpartition(':')
+        if not sep:
+            targets.append((item, default_port))
+            continue
+        first, _, last = ports.partition('-')
+        first = int(first)
+        last = int(last) if last else first
+        targets.extend((host, port) for port in range(first, last + 1))
+    return targets
+
+class ConnectStats:
+    def __init__(self):
+        self.samples = []
+        self.failures = {}
+
+    def add(self, seconds):
+        self.samples.append(seconds * 1000)
+
+    def fail(self, reason):
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+    @property
+    def attempts(self):
+        return len(self.samples) + sum(self.failures.values())
+
+    def summary(self):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+        return ordered[0], sum(ordered) / len(ordered), p95
+
+def describe_error(error):
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, OSError) and error.errno:
+        return os.strerror(error.errno)
+    return str(error) or error.__class__.__name__
+
+async def probe_connect(host, port, timeout):
+    started = time.perf_counter()
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    elapsed = time.perf_counter() - started
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, OSError):
+        pass
+    return elapsed
+
+async def connect_sweep(targets, count=5, timeout=5.0, concurrency=64, on_result=None):
+    # Conexões de um mesmo alvo são sequenciais (mede o accept, não a fila
+    # que nós mesmos criaríamos); alvos diferentes correm em paralelo
+    stats = {target: ConnectStats() for target in targets}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def sweep_target(target):
+        for _ in range(count):
+            async with limit:
+                try:
+                    stats[target].add(await probe_connect(target[0], target[1], timeout))
+                except (OSError, asyncio.TimeoutError) as e:
+                    stats[target].fail(describe_error(e))
+            if on_result:
+                on_result(target, stats[target])
+
+    await asyncio.gather(*(sweep_target(target) for target in stats))
+    return stats
+
+class FanOutSession:
+    def __init__(self, targets, timeout=10):
+        self.clients = {f"{host}:{port}": AsyncTelnetClient(host, port, timeout) for host, port in targets}
+        self.errors = {}
+
+    async def connect(self):
+        names = list(self.clients)
+        results = await asyncio.gather(*(self.clients[name].connect() for name in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                self.errors[name] = str(result) or type(result).__name__
+                del self.clients[name]
+        return self.errors
+
+    async def execute(self, command):
+        async def one(name, client):
+            started = time.perf_counter()
+            try:
+                response = strip_ansi(await client.execute(command)).strip('\n')
+                return name, response, (time.perf_counter() - started) * 1000, None
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                return name, "", (time.perf_counter() - started) * 1000, str(e) or type(e).__name__
+
+        return await asyncio.gather(*(one(name, client) for name, client in self.clients.items()))
+
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self.clients.values()), return_exceptions=True)
+
+class CommandRecording:
+    def __init__(self, path, host, port):
+        self.path = path
+        self.count = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.file = open(path, 'w', encoding='utf-8', buffering=1)
+        self._write({'type': 'recording', 'host': host, 'port': port, 'started': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def record(self, command, sent_at, seconds):
+        # sent_at vem do mesmo perf_counter usado na medição de latência
+        with self._lock:
+            if self.file.closed:
+                return
+            self._write({
+                'type': 'command',
+                'offset': round(sent_at - self.started, 6),
+                'command': command,
+                'rtt_ms': round(seconds * 1000, 3)
+            })
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+def load_recording(path):
+    commands = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('type') == 'command':
+                commands.append((record['offset'], record['command'], record.get('rtt_ms')))
+    return commands
+
+STATUS_FIELDS = {
+    'Uptime': 'uptime',
+    'Usuários Conectados': 'users',
+    'Conexões Totais': 'total_connections',
+    'Comandos Executados': 'commands_executed',
+    'Nós Ativos': 'nodes'
+}
+
+USER_LINE_RE = re.compile(r'^\d+\. (\S+) - (\S+) - (.+?) - (\d+) cmds(?: - nó (.+))?$')
+
+def parse_status(response):
+    status = {}
+    for line in strip_ansi(response).splitlines():
+        label, sep, value = line.partition(':')
+        key = STATUS_FIELDS.get(label.strip())
+        # Com cluster a resposta repete contadores; vale a primeira (nó local)
+        if sep and key and key not in status:
+            value = value.strip()
+            status[key] = int(value) if value.isdigit() else value
+    return status
+
+def parse_users(response):
+    users = []
+    for line in strip_ansi(response).splitlines():
+        match = USER_LINE_RE.match(line.strip())
+        if match:
+            username, ip, duration, commands, node = match.groups()
+            users.append({'username': username, 'ip': ip, 'duration': duration, 'commands': int(commands), 'node': node})
+    return users
+
+def parse_uptime(response):
+    _, _, uptime = strip_ansi(response).partition(':')
+    return uptime.strip()
+
+class ServerMonitor:
+    COMMANDS = ('status', 'users', 'uptime')
+    PARSERS = {'status': parse_status, 'users': parse_users, 'uptime': parse_uptime}
+
+    def __init__(self, host, port, history=60, timeout=5):
+        self.client = AsyncTelnetClient(host, port, timeout)
+        self.username = None
+        self.raw = {}
+        self.parsed = {command: None for command in self.COMMANDS}
+        self.versions = {command: 0 for command in self.COMMANDS}
+        self.sessions = deque(maxlen=history)
+        self.rates = deque(maxlen=history)
+        self.user_trends = {}
+        self.user_totals = {}
+        self.poll_ms = None
+        self.polls = 0
+        self._last = None
+
+    async def connect(self):
+        await self.client.connect()
+        for line in strip_ansi(await self.client.execute('whoami')).splitlines():
+            label, _, value = line.partition(':')
+            if label.strip() == 'Usuário':
+                self.username = value.strip()
+
+    async def close(self):
+        await self.client.close()
+
+    async def poll(self):
+        # Os três comandos vão em pipeline: uma ida e volta por atualização
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(self.client.execute(command) for command in self.COMMANDS))
+        self.poll_ms = (time.perf_counter() - started) * 1000
+        self.polls += 1
+
+        for command, response in zip(self.COMMANDS, responses):
+            # Resposta idêntica à anterior reaproveita o snapshot já interpretado
+            if self.raw.get(command) != response:
+                self.raw[command] = response
+                self.parsed[command] = self.PARSERS[command](response)
+                self.versions[command] += 1
+
+        self._update_trends(time.monotonic())
+
+    def _update_trends(self, now):
+        status = self.parsed['status'] or {}
+        users = self.visible_users()
+        self.sessions.append(len(users))
+
+        executed = status.get('commands_executed')
+        if isinstance(executed, int) and self._last:
+            last_time, last_executed = self._last
+            # Desconta os comandos do próprio painel desde a última leitura
+            delta = max(executed - last_executed - len(self.COMMANDS), 0)
+            self.rates.append(delta / max(now - last_time, 1e-6))
+        if isinstance(executed, int):
+            self._last = (now, executed)
+
+        seen = set()
+        for user in users:
+            name = user['username']
+            seen.add(name)
+            previous = self.user_totals.get(name)
+            trend = self.user_trends.setdefault(name, deque(maxlen=self.sessions.maxlen))
+            trend.append(user['commands'] - previous if previous is not None else 0)
+            self.user_totals[name] = user['commands']
+        for name in list(self.user_trends):
+            if name not in seen:
+                del self.user_trends[name]
+                del self.user_totals[name]
+
+    def visible_users(self):
+        return [user for user in self.parsed['users'] or () if user['username'] != self.username]
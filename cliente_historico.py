@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import gzip
+import heapq
+import json
+import math
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+
+Message = namedtuple('Message', 'time direction text')
+
+# Tupla de 3 campos; o horário vem do relógio em cache e é compartilhado
+MESSAGE_OVERHEAD = sys.getsizeof(Message('', '', ''))
+
+def message_size(message):
+    return MESSAGE_OVERHEAD + sys.getsizeof(message.text)
+
+def message_plain(message):
+    arrow = {'command': '>', 'event': '*'}.get(message.direction, '<')
+    return f"{message.time} {arrow} {message.text}"
+
+def unique_path(directory, prefix, suffix):
+    # Dois arquivos no mesmo segundo ganham um contador em vez de se sobrescreverem
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(directory, f"{prefix}_{stamp}{suffix}")
+    counter = 1
+    while os.path.exists(path) or os.path.exists(path + '.gz'):
+        path = os.path.join(directory, f"{prefix}_{stamp}_{counter}{suffix}")
+        counter += 1
+    return path
+
+def write_ndjson(path, records, compress=False):
+    # Um objeto por linha, gravado conforme o gerador produz: memória constante
+    if compress:
+        f = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    else:
+        f = open(path, 'w', encoding='utf-8', buffering=64 * 1024)
+
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    count = 0
+    with f:
+        for record in records:
+            f.write(encode(record))
+            f.write("\n")
+            count += 1
+    return count
+
+class SessionRecorder:
+    def __init__(self, directory='.', prefix='session', max_bytes=10 * 1024 * 1024,
+                 max_seconds=3600, compress=False, flush_interval=0.5, queue_size=100000):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self.path = None
+        self.segments = []
+        self.lines = 0
+        self.dropped = 0
+        self.error = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="gravador")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def write(self, line):
+        # Chamado pelas threads de recepção e da interface: nunca bloqueia
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def _open_segment(self):
+        self.path = unique_path(self.directory, self.prefix, '.log')
+        self.segments.append(self.path)
+        return open(self.path, 'w', encoding='utf-8', buffering=64 * 1024), time.monotonic()
+
+    def _close_segment(self, f):
+        f.close()
+        if not self.compress:
+            return
+        with open(self.path, 'rb') as source, gzip.open(self.path + '.gz', 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(self.path)
+        self.segments[-1] = self.path + '.gz'
+
+    def _run(self):
+        f, opened_at = self._open_segment()
+        written = 0
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    batch = []
+                # Esvazia o que já chegou para gravar tudo com uma só escrita
+                while len(batch) < 1000:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    batch = batch[:batch.index(None)]
+                    stopping = True
+
+                if batch:
+                    data = "\n".join(batch) + "\n"
+                    f.write(data)
+                    f.flush()
+                    written += len(data)
+                    self.lines += len(batch)
+
+                # Sessão ociosa não gira: evita uma trilha de segmentos vazios
+                if not stopping and written and (written >= self.max_bytes or time.monotonic() - opened_at >= self.max_seconds):
+                    self._close_segment(f)
+                    f, opened_at = self._open_segment()
+                    written = 0
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            if not f.closed:
+                self._close_segment(f)
+
+class Scrollback:
+    def __init__(self, max_lines=100000, max_bytes=64 * 1024 * 1024, sizeof=sys.getsizeof):
+        if max_lines < 1 or max_bytes < 1:
+            raise ValueError("Limites do scrollback devem ser maiores que zero")
+        self.capacity = max_lines
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._items = [None] * max_lines
+        self._sizes = [0] * max_lines
+        self._lock = threading.Lock()
+        # Números de sequência absolutos: o slot de um item é seq % capacity
+        self.first = 0
+        self.next = 0
+        self.bytes = 0
+
+    def __len__(self):
+        return self.next - self.first
+
+    def __iter__(self):
+        for _, item in self.since(self.first):
+            yield item
+
+    def _evict(self):
+        slot = self.first % self.capacity
+        self.bytes -= self._sizes[slot]
+        self._items[slot] = None
+        self._sizes[slot] = 0
+        self.first += 1
+
+    def append(self, item):
+        size = self.sizeof(item)
+        with self._lock:
+            if self.next - self.first == self.capacity:
+                self._evict()
+
+            slot = self.next % self.capacity
+            self._items[slot] = item
+            self._sizes[slot] = size
+            self.bytes += size
+            self.next += 1
+
+            while self.bytes > self.max_bytes and self.next - self.first > 1:
+                self._evict()
+            return self.next - 1
+
+    def clear(self):
+        with self._lock:
+            while self.first < self.next:
+                self._evict()
+
+    def get(self, seq):
+        with self._lock:
+            if self.first <= seq < self.next:
+                return self._items[seq % self.capacity]
+        return None
+
+    def tail(self, count):
+        with self._lock:
+            start = max(self.first, self.next - count)
+            return [self._items[seq % self.capacity] for seq in range(start, self.next)]
+
+    def since(self, seq):
+        # Lê item a item sem segurar a trava durante toda a iteração; se o item
+        # foi descartado no meio do caminho, pula para o mais antigo ainda válido
+        seq = max(seq, self.first)
+        while seq < self.next:
+            item = self._items[seq % self.capacity]
+            if seq < self.first:
+                seq = self.first
+                continue
+            if item is not None:
+                yield seq, item
+            seq += 1
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Acima disso as candidatas mais antigas são ordenadas só por recência
+RANK_LIMIT = 20000
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}
+        self.refs = {}
+        self.next_id = 0
+        self.stale = 0
+        self._vocab = []
+        self._vocab_dirty = False
+        self._lock = threading.Lock()
+
+    def add(self, kind, ref, text):
+        with self._lock:
+            doc_id = self.next_id
+            self.next_id += 1
+            self.docs[doc_id] = (kind, ref, text)
+            self.refs.setdefault(kind, deque()).append((ref, doc_id))
+
+            for token in set(TOKEN_RE.findall(text.lower())):
+                postings = self.postings.get(token)
+                if postings is None:
+                    self.postings[token] = [doc_id]
+                    self._vocab_dirty = True
+                else:
+                    postings.append(doc_id)
+            return doc_id
+
+    def discard_before(self, kind, ref):
+        with self._lock:
+            refs = self.refs.get(kind)
+            while refs and refs[0][0] < ref:
+                del self.docs[refs.popleft()[1]]
+                self.stale += 1
+            self._maybe_compact()
+
+    def discard_kind(self, kind):
+        with self._lock:
+            for _, doc_id in self.refs.pop(kind, ()):
+                del self.docs[doc_id]
+                self.stale += 1
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self.stale <= max(len(self.docs), 1000):
+            return
+
+        docs = self.docs
+        for token in list(self.postings):
+            alive = [doc_id for doc_id in self.postings[token] if doc_id in docs]
+            if alive:
+                self.postings[token] = alive
+            else:
+                del self.postings[token]
+        self.stale = 0
+        self._vocab_dirty = True
+
+    def _prefix_tokens(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self.postings)
+            self._vocab_dirty = False
+
+        start = bisect.bisect_left(self._vocab, prefix)
+        tokens = []
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def _candidates(self, tokens):
+        ids = set()
+        for token in tokens:
+            ids.update(self.postings.get(token, ()))
+        return ids
+
+    def search(self, query, page=1, page_size=10):
+        terms = query.split()
+        patterns = []
+        groups = []
+
+        for term in terms:
+            if len(term) > 2 and term.startswith('/') and term.endswith('/'):
+                patterns.append(re.compile(term[1:-1], re.IGNORECASE))
+            elif term.endswith('*'):
+                prefix = term[:-1].lower()
+                groups.append((None, prefix))
+            else:
+                for token in TOKEN_RE.findall(term.lower()):
+                    groups.append((token, None))
+
+        with self._lock:
+            candidates = None
+            weights = []
+            for token, prefix in groups:
+                tokens = [token] if token is not None else self._prefix_tokens(prefix)
+                weights.append(token if token is not None else prefix)
+                ids = self._candidates(tokens)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return 0, []
+
+            if candidates is None:
+                docs = list(self.docs.items())
+            else:
+                docs = [(doc_id, self.docs[doc_id]) for doc_id in candidates if doc_id in self.docs]
+
+        if patterns:
+            docs = [(doc_id, doc) for doc_id, doc in docs if all(p.search(doc[2]) for p in patterns)]
+
+        # Mais ocorrências dos termos primeiro; empate resolvido pelo mais recente
+        docs.sort(key=lambda item: item[0], reverse=True)
+        ranked = docs[:RANK_LIMIT]
+        if weights:
+            ranked.sort(key=lambda item: sum(item[1][2].lower().count(token) for token in weights), reverse=True)
+
+        results = ranked + docs[RANK_LIMIT:]
+        start = (page - 1) * page_size
+        return len(results), [doc for _, doc in results[start:start + page_size]]
+
+# Meia-vida do peso de recência de um comando, em segundos
+HISTORY_HALF_LIFE = 7 * 86400
+MAX_HISTORY_COMMAND = 500
+
+class TrieNode:
+    __slots__ = ('label', 'children', 'command', 'rank', 'count', 'last', 'top')
+
+    def __init__(self, label=""):
+        self.label = label
+        self.children = {}
+        self.command = None
+        self.rank = None
+        self.count = 0
+        self.last = 0
+        self.top = None
+
+def _common_length(a, b):
+    size = min(len(a), len(b))
+    i = 0
+    while i < size and a[i] == b[i]:
+        i += 1
+    return i
+
+class HistoryTrie:
+    # Árvore radix: cadeias sem ramificação viram uma aresta só, o que mantém
+    # o número de nós perto do número de comandos distintos
+    def __init__(self, top_size=10, half_life=HISTORY_HALF_LIFE):
+        self.root = TrieNode()
+        self.top_size = top_size
+        self.half_life = half_life
+        self.size = 0
+
+    def insert(self, command, when):
+        node = self.root
+        node.top = None
+        rest = command
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = node.children[rest[0]] = TrieNode(rest)
+                node = child
+                break
+
+            common = _common_length(child.label, rest)
+            if common < len(child.label):
+                middle = node.children[rest[0]] = TrieNode(child.label[:common])
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                child = middle
+            # Só os ancestrais do comando alterado perdem o top-k em cache
+            child.top = None
+            node = child
+            rest = rest[common:]
+
+        if node.command is None:
+            node.command = command
+            self.size += 1
+        # Contagem com decaimento exponencial guardada em log2 e deslocada pelo
+        # tempo: a ordem entre comandos não depende do instante da consulta
+        offset = when / self.half_life
+        if node.rank is None:
+            node.rank = offset
+        else:
+            high, low = max(node.rank, offset), min(node.rank, offset)
+            node.rank = high + math.log2(1 + 2 ** (low - high))
+        node.count += 1
+        node.last = max(node.last, when)
+
+    def _find(self, prefix):
+        node = self.root
+        rest = prefix
+        while rest:
+            node = node.children.get(rest[0])
+            if node is None:
+                return None
+            if rest.startswith(node.label):
+                rest = rest[len(node.label):]
+            elif node.label.startswith(rest):
+                break
+            else:
+                return None
+        return node
+
+    def _top(self, node):
+        if node.top is None:
+            candidates = [(node.rank, node.command, node)] if node.command is not None else []
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            node.top = heapq.nlargest(self.top_size, candidates, key=lambda item: item[0])
+        return node.top
+
+    def complete(self, prefix, limit=None):
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [(command, found.count, found.last) for _, command, found in self._top(node)[:limit or self.top_size]]
+
+class CommandHistory:
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._trie = None
+        self._pending = None
+        self._loader = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _read_lines(self):
+        try:
+            with open(self.path, encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+
+        # Arquivo só cresce: acima do dobro do limite é regravado com as mais recentes
+        if len(lines) > 2 * self.max_entries:
+            lines = lines[-self.max_entries:]
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError:
+                pass
+        return lines
+
+    def _load(self):
+        # Só a leitura do arquivo segura a trava; a árvore é montada fora dela e
+        # comandos digitados nesse meio tempo ficam em _pending
+        with self._lock:
+            lines = self._read_lines()
+            self._pending = []
+
+        trie = HistoryTrie()
+        for line in lines:
+            when, _, command = line.partition('\t')
+            try:
+                trie.insert(command, float(when))
+            except ValueError:
+                continue
+
+        with self._lock:
+            for command, when in self._pending:
+                trie.insert(command, when)
+            # Preenche o top-k de todos os nós de uma vez: nenhuma consulta paga a varredura
+            trie.complete('')
+            self._pending = None
+            self._trie = trie
+
+    def preload(self):
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load, name="historico")
+                self._loader.daemon = True
+                self._loader.start()
+        return self._loader
+
+    def wait_loaded(self, timeout=None):
+        self.preload().join(timeout)
+        return self._trie is not None
+
+    @property
+    def size(self):
+        return self._trie.size if self._trie is not None else 0
+
+    def add(self, command):
+        command = command.strip().replace('\t', ' ')[:MAX_HISTORY_COMMAND]
+        if not command:
+            return
+        when = time.time()
+        with self._lock:
+            if self._trie is not None:
+                self._trie.insert(command, when)
+            elif self._pending is not None:
+                self._pending.append((command, when))
+            try:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+                self._file.write(f"{when:.0f}\t{command}\n")
+            except OSError:
+                pass
+
+    def complete(self, prefix, limit=None):
+        # Nunca bloqueia quem digita: enquanto o arquivo carrega não há sugestões
+        self.preload()
+        with self._lock:
+            if self._trie is None:
+                return []
+            return self._trie.complete(prefix, limit)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+
+from cliente_core import AsyncTelnetClient, LatencyHistogram, QUIT_COMMANDS, load_recording, response_failed
+
+async def replay_session(host, port, commands, speed, timeout, results, label):
+    client = AsyncTelnetClient(host, port, timeout)
+    try:
+        await client.connect()
+    except (OSError, asyncio.TimeoutError) as e:
+        results.append({'session': label, 'command': '', 'original_ms': None, 'replay_ms': None, 'lag_ms': None, 'error': f"conexao: {str(e) or 'timeout'}"})
+        return
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        for offset, command, original_ms in commands:
+            if command.lower() in QUIT_COMMANDS:
+                break
+            # Mantém o ritmo original (comprimido por speed); atrasos acumulados não são recuperados
+            delay = started + offset / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag_ms = max(loop.time() - (started + offset / speed), 0) * 1000
+
+            sent_at = time.perf_counter()
+            error = ''
+            try:
+                response = await client.execute(command, timeout)
+                if response_failed(response):
+                    error = 'nao reconhecido'
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                error = str(e) or 'timeout'
+            results.append({
+                'session': label,
+                'command': command,
+                'original_ms': original_ms,
+                'replay_ms': round((time.perf_counter() - sent_at) * 1000, 3),
+                'lag_ms': round(lag_ms, 3),
+                'error': error
+            })
+            if not client.connected:
+                break
+    finally:
+        await client.close()
+
+async def replay(host, port, recordings, sessions, speed, timeout):
+    results = []
+    tasks = []
+    for path, commands in recordings:
+        for copy in range(sessions):
+            label = f"{path}#{copy + 1}"
+            tasks.append(replay_session(host, port, commands, speed, timeout, results, label))
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - started
+
+def summarize(results):
+    by_command = {}
+    for result in results:
+        if not result['command'] or result['error']:
+            continue
+        name = result['command'].split()[0].lower()
+        original, replayed = by_command.setdefault(name, (LatencyHistogram(window=100000), LatencyHistogram(window=100000)))
+        if result['original_ms'] is not None:
+            original.record(result['original_ms'] / 1000)
+        replayed.record(result['replay_ms'] / 1000)
+    return by_command
+
+def print_summary(results, elapsed, out):
+    by_command = summarize(results)
+    errors = [result for result in results if result['error']]
+    sent = sum(1 for result in results if result['command'])
+
+    out.write(f"{sent} comandos em {elapsed:.2f}s ({sent / elapsed if elapsed else 0:.1f} cmd/s), {len(errors)} erros\n\n")
+    out.write(f"{'comando':<12} {'n':>6} {'orig p50':>10} {'orig p95':>10} {'replay p50':>11} {'replay p95':>11} {'delta p50':>10}\n")
+    for name, (original, replayed) in sorted(by_command.items()):
+        original_p50 = original.percentile(50)
+        replayed_p50 = replayed.percentile(50)
+        out.write(f"{name:<12} {replayed.total:>6} {original_p50:>9.2f}ms {original.percentile(95):>9.2f}ms "
+                  f"{replayed_p50:>10.2f}ms {replayed.percentile(95):>10.2f}ms {replayed_p50 - original_p50:>+9.2f}ms\n")
+
+    lags = [result['lag_ms'] for result in results if result['lag_ms'] is not None]
+    if lags:
+        out.write(f"\nAtraso de agendamento: max {max(lags):.2f}ms\n")
+    for result in errors[:10]:
+        out.write(f"ERRO {result['session']} {result['command']!r}: {result['error']}\n")
+
+def write_report(path, results):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['session', 'command', 'original_ms', 'replay_ms', 'lag_ms', 'error'])
+        writer.writeheader()
+        writer.writerows(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz sessoes gravadas com :rec contra um servidor")
+    parser.add_argument('recordings', nargs='+', help="Arquivos workload_*.ndjson")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2323)
+    parser.add_argument('--sessions', type=int, default=1, help="Sessoes simultaneas por gravacao")
+    parser.add_argument('--speed', type=float, default=1.0, help="Fator de compressao do tempo (10 = 10x mais rapido)")
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--report', help="CSV com a latencia de cada comando")
+    args = parser.parse_args()
+
+    if args.speed <= 0 or args.sessions < 1:
+        parser.error("--speed deve ser positivo e --sessions pelo menos 1")
+
+    recordings = []
+    for path in args.recordings:
+        try:
+            recordings.append((path, load_recording(path)))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"ERRO: {path}: {e}", file=sys.stderr)
+            return 2
+
+    results, elapsed = asyncio.run(replay(args.host, args.port, recordings, args.sessions, args.speed, args.timeout))
+    if args.report:
+        write_report(args.report, results)
+    print_summary(results, elapsed, sys.stdout)
+    return 1 if any(result['error'] for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,28 @@ import socket
 import threading
 import sys
 import time
+import queue
+import codecs
+import asyncio
+import io
+from collections import deque
 from datetime import datetime
 import os
-import random
+import re
+
+# Modo batch: sai antes de importar rich/questionary para iniciar rápido
+if __name__ == "__main__" and '--batch' in sys.argv[1:]:
+    from cliente_core import run_batch
+    sys.exit(run_batch(sys.argv[1:]))
+
+from relogio import clock
+from opcoes import parse_options
+from cliente_core import TelnetConnection, LatencyTracker, Backoff, FanOutSession, CommandRecording, ServerMonitor, connect_sweep, expand_targets, PROMPT_EVENT, QUIT_COMMANDS, parse_target, sparkline
+from sistema import SystemSampler, platform_facts, format_rate
+from calculadora import Calculator, CalcError
+from senhas import PasswordGenerator, entropy_label, write_passwords
+from agendador import TimerScheduler, parse_duration
+from cliente_historico import Scrollback, SearchIndex, SessionRecorder, CommandHistory, Message, message_size, message_plain, unique_path, write_ndjson
 
 try:
     from rich.console import Console
@@ -15,7 +34,12 @@ try:
     from rich.table import Table
     from rich.progress import Progress, SpinnerColumn, TextColumn
     from rich.text import Text
+    from rich.markup import escape
+    from rich.live import Live
+    from rich.console import Group
     from rich.align import Align
+    from rich.columns import Columns
+    from rich.layout import Layout
     from rich import box
     import questionary
 except ImportError:
@@ -23,19 +47,177 @@ except ImportError:
     print("Instale com: pip install rich questionary")
     sys.exit(1)
 
+class LineInput:
+    def __init__(self, on_change=None, completer=None):
+        self.text = ""
+        self.suggestion = ""
+        self.on_change = on_change
+        self.completer = completer
+        self.lines = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="entrada")
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+    
+    def get(self, timeout=None):
+        return self.lines.get(timeout=timeout)
+    
+    def handle_key(self, key):
+        if key in ('\r', '\n'):
+            line, self.text = self.text, ""
+            self.lines.put(line)
+        elif key in ('\x7f', '\x08'):
+            self.text = self.text[:-1]
+        elif key in ('\x03', '\x04'):
+            if key == '\x03' or not self.text:
+                self.lines.put(None)
+        elif key == '\t':
+            if self.suggestion:
+                self.text = self.suggestion
+        elif len(key) == 1 and key.isprintable():
+            self.text += key
+        else:
+            return
+        
+        self.suggestion = self.completer(self.text) if self.completer and self.text else ""
+        if self.on_change:
+            self.on_change()
+    
+    def _run(self):
+        if not sys.stdin.isatty():
+            self._run_lines()
+        elif os.name == 'nt':
+            self._run_windows()
+        else:
+            self._run_posix()
+    
+    def _run_lines(self):
+        if os.name == 'nt':
+            for line in sys.stdin:
+                self.lines.put(line.rstrip('\r\n'))
+            self.lines.put(None)
+            return
+        
+        import select
+        
+        # Byte a byte direto do descritor e com espera limitada: a thread para
+        # com stop() e não consome linhas destinadas ao próximo prompt
+        fd = sys.stdin.fileno()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        line = ""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.1)
+            if not ready:
+                continue
+            data = os.read(fd, 1)
+            if not data:
+                self.lines.put(None)
+                return
+            char = decoder.decode(data)
+            if char != '\n':
+                line += char
+                continue
+            self.lines.put(line.rstrip('\r'))
+            line = ""
+            # Só lê a próxima linha depois que esta for consumida
+            while not self._stop.is_set() and not self.lines.empty():
+                time.sleep(0.02)
+    
+    def _run_windows(self):
+        import msvcrt
+        while not self._stop.is_set():
+            if not msvcrt.kbhit():
+                time.sleep(0.02)
+                continue
+            key = msvcrt.getwch()
+            if key in ('\x00', '\xe0'):
+                # Teclas especiais: o código vem no próximo caractere
+                key = {'H': 'UP', 'P': 'DOWN', 'K': 'LEFT', 'M': 'RIGHT'}.get(msvcrt.getwch(), '')
+            self.handle_key(key)
+    
+    def _run_posix(self):
+        import termios
+        import tty
+        import select
+        
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        try:
+            tty.setcbreak(fd)
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.1)
+                if not ready:
+                    continue
+                
+                data = decoder.decode(os.read(fd, 1024))
+                i = 0
+                while i < len(data):
+                    if data[i] == '\x1b' and data[i + 1:i + 2] == '[':
+                        # Sequência de escape (setas): ESC [ ... letra
+                        j = i + 2
+                        while j < len(data) and not data[j].isalpha() and data[j] != '~':
+                            j += 1
+                        code = data[j] if j < len(data) else ''
+                        self.handle_key({'A': 'UP', 'B': 'DOWN', 'C': 'RIGHT', 'D': 'LEFT'}.get(code, ''))
+                        i = j + 1
+                    else:
+                        self.handle_key(data[i])
+                        i += 1
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
 class TechUnisenacClient:
-    def __init__(self):
+    def __init__(self, max_messages=100000, max_message_bytes=64 * 1024 * 1024):
         self.console = Console()
-        self.socket = None
+        self.connection = TelnetConnection()
         self.connected = False
         self.connection_time = None
         self.host = '127.0.0.1'
         self.port = 2323
-        self.message_buffer = []
-        self.max_messages = 50
+        self.max_messages = max_messages
+        self.message_buffer = Scrollback(max_messages, max_message_bytes, sizeof=message_size)
         self.connection_history = []
         self.command_history = []
+        self.command_store = CommandHistory(os.path.join(os.path.expanduser('~'), '.tech_unisenac_history'))
         self.session_notes = []
+        self.search_index = SearchIndex()
+        self.ui_dirty = threading.Event()
+        self.render_lock = threading.Lock()
+        self.max_fps = 20
+        self.line_input = None
+        self.terminal_result = None
+        self.pending_responses = deque()
+        self.latency = LatencyTracker()
+        self.connection_closed = threading.Event()
+        self.response_timeout = 5.0
+        self.awaiting_response = False
+        self.send_lock = threading.Lock()
+        self.link_state = 'desconectado'
+        self.closing = False
+        self.max_reconnect_attempts = 10
+        self.reconnect_wake = threading.Event()
+        # Tentativas acumulam entre quedas seguidas; só um prompt recebido zera
+        self.reconnect_backoff = Backoff()
+        self.outbox = deque()
+        self.max_queued_commands = 100
+        self.system_sampler = None
+        self.calculator = Calculator()
+        self.scheduler = TimerScheduler(on_fire=self.on_timer_fired)
+        self.notifications = deque(maxlen=20)
+        self.recorder = None
+        self.recorder_options = {}
+        self.command_recording = None
+        self.export_marks = {'messages': 0, 'commands': 0, 'notes': 0, 'connections': 0}
         self.session_stats = {
             'commands_sent': 0,
             'messages_received': 0,
@@ -67,21 +249,32 @@ class TechUnisenacClient:
             progress.add_task(f"{message}...", total=None)
             time.sleep(duration)
     
-    def print_success(self, message):
-        self.console.print(f"[bold green]OK[/bold green] {message}")
+    def print_success(self, message, console=None):
+        (console or self.console).print(f"[bold green]OK[/bold green] {message}")
     
-    def print_error(self, message):
-        self.console.print(f"[bold red]ERRO[/bold red] {message}")
+    def print_error(self, message, console=None):
+        (console or self.console).print(f"[bold red]ERRO[/bold red] {message}")
     
-    def print_warning(self, message):
-        self.console.print(f"[bold yellow]AVISO[/bold yellow] {message}")
+    def print_warning(self, message, console=None):
+        (console or self.console).print(f"[bold yellow]AVISO[/bold yellow] {message}")
     
     def show_status_panel(self):
         if self.connected:
             status_text = f"[bold green]CONECTADO[/bold green] - {self.host}:{self.port}"
+        elif self.link_state == 'reconectando':
+            status_text = f"[bold yellow]RECONECTANDO[/bold yellow] - {self.host}:{self.port}"
         else:
             status_text = "[bold red]DESCONECTADO[/bold red]"
         
+        active_timers = self.scheduler.active_count()
+        if active_timers:
+            status_text += f"\n[cyan]Timers ativos:[/cyan] {active_timers}"
+        
+        # Avisos que chegaram enquanto outra tela estava aberta
+        while self.notifications:
+            notified_at, text = self.notifications.popleft()
+            status_text += f"\n[bold yellow]⏰ {notified_at}[/bold yellow] {escape(text)}"
+        
         panel = Panel(status_text, title="[bold]Status da Conexao[/bold]", border_style="blue")
         self.console.print(panel)
         self.console.print()
@@ -104,6 +297,8 @@ class TechUnisenacClient:
             choices.append({"name": "Bloco de Notas", "value": "notepad"})
             choices.append({"name": "Gerador de Senhas", "value": "password"})
 
+        choices.append({"name": "Painel do Servidor", "value": "dashboard"})
+        choices.append({"name": "Multi-Servidor", "value": "fanout"})
         choices.append({"name": "Sair", "value": "exit"})
         
         return questionary.select(
@@ -157,26 +352,27 @@ class TechUnisenacClient:
             self.print_warning("Ja conectado!")
             return
         
+        self.stop_reconnect()
+        
         try:
             self.print_loading(f"Conectando a {self.host}:{self.port}", 1.5)
             
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(10)
-            self.socket.connect((self.host, self.port))
+            self.connection.connect(self.host, self.port, timeout=10)
             
             self.connected = True
             self.connection_time = time.time()
+            self.closing = False
+            self.link_state = 'conectado'
+            self.reconnect_backoff.reset()
             
             self.connection_history.append({
                 'host': self.host,
                 'port': self.port,
-                'time': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'time': clock.datetime_str,
                 'status': 'Sucesso'
             })
             
-            receive_thread = threading.Thread(target=self.receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
+            self.start_receiving()
             
             self.print_success("Conectado com sucesso!")
             
@@ -184,23 +380,30 @@ class TechUnisenacClient:
             self.connection_history.append({
                 'host': self.host,
                 'port': self.port,
-                'time': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'time': clock.datetime_str,
                 'status': f'Falha: {str(e)[:30]}...'
             })
             self.print_error(f"Erro na conexao: {e}")
     
     def disconnect_from_server(self):
+        if self.link_state == 'reconectando':
+            self.stop_reconnect()
+            self.print_success("Reconexao automatica cancelada.")
+            return
+        
         if not self.connected:
             self.print_warning("Nao ha conexao ativa.")
             return
         
         try:
-            if self.socket:
-                self.socket.send("quit\n".encode('utf-8'))
-                time.sleep(0.5)
-                self.socket.close()
+            self.closing = True
+            if self.connection.sock:
+                self.connection.send("quit")
+                self.connection_closed.wait(self.response_timeout)
+                self.connection.close()
             
             self.connected = False
+            self.link_state = 'desconectado'
             self.connection_time = None
             
             self.print_success("Desconectado com sucesso!")
@@ -208,60 +411,244 @@ class TechUnisenacClient:
         except Exception as e:
             self.print_error(f"Erro ao desconectar: {e}")
     
+    def start_receiving(self):
+        self.connection_closed.clear()
+        self.pending_responses.clear()
+        # O primeiro prompt encerra a mensagem de boas-vindas
+        self.pending_responses.append((threading.Event(), None, 0))
+        
+        receive_thread = threading.Thread(target=self.receive_messages)
+        receive_thread.daemon = True
+        receive_thread.start()
+    
     def receive_messages(self):
-        buffer = ""
         while self.connected:
             try:
-                if self.socket:
-                    data = self.socket.recv(4096)
-                    if data:
-                        message = data.decode('utf-8', errors='ignore')
-                        buffer += message
-                        
-                        while '\n' in buffer:
-                            line, buffer = buffer.split('\n', 1)
-                            if line.strip():
-                                self.add_message(line.rstrip('\r'), "server")
-                        
-                        if buffer and not buffer.endswith('Digite um comando: '):
-                            self.add_message(buffer.strip(), "server")
-                            buffer = ""
-                        elif buffer.endswith('Digite um comando: '):
-                            buffer = ""
+                events = self.connection.receive()
+                if events is None:
+                    self.connected = False
+                    break
+                
+                for event in events:
+                    if event is PROMPT_EVENT:
+                        # Servidor respondeu com prompt: a conexão está estável
+                        self.reconnect_backoff.reset()
+                        self.complete_response()
+                    else:
+                        self.add_message(event, "server")
                             
             except socket.timeout:
                 continue
             except Exception as e:
                 self.connected = False
                 break
+        
+        self.connection_closed.set()
+        # O estado muda antes de liberar quem espera resposta, para o terminal
+        # ver "reconectando" e não sair do loop
+        if not self.closing and self.link_state == 'conectado' and self.max_reconnect_attempts > 0:
+            self.begin_reconnect()
+        while self.pending_responses:
+            self.complete_response(record=False)
+        self.ui_dirty.set()
+    
+    def complete_response(self, record=True):
+        try:
+            done, command, sent_at = self.pending_responses.popleft()
+        except IndexError:
+            return
+        
+        if record and command is not None:
+            elapsed = time.perf_counter() - sent_at
+            self.latency.record(command, elapsed)
+            if self.command_recording:
+                self.command_recording.record(command, sent_at, elapsed)
+        done.set()
+    
+    def send_command(self, command, wait=True):
+        # Cada comando espera o prompt correspondente; o timeout só vale como
+        # proteção caso o servidor nunca responda
+        done = threading.Event()
+        # Terminal e reenvio da fila podem enviar ao mesmo tempo: a ordem da
+        # fila de respostas precisa ser a mesma da escrita no socket
+        with self.send_lock:
+            self.pending_responses.append((done, command, time.perf_counter()))
+            self.session_stats['bytes_sent'] += self.connection.send(command)
+        if wait:
+            done.wait(self.response_timeout)
+        return done
     
     def add_message(self, message, message_type="server"):
         if not message.strip():
             return
             
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        
         if message_type == "command":
-            formatted_message = f"[dim]{timestamp}[/dim] [bold blue]>[/bold blue] [cyan]{message}[/cyan]"
             self.session_stats['commands_sent'] += 1
-        else:
-            formatted_message = f"[dim]{timestamp}[/dim] [bold green]<[/bold green] {message}"
+        elif message_type == "server":
             self.session_stats['messages_received'] += 1
             self.session_stats['bytes_received'] += len(message.encode('utf-8'))
         
-        self.message_buffer.append(formatted_message)
+        if self.recorder:
+            self.recorder.write(message_plain(Message(clock.datetime_str, message_type, message)))
         
-        if len(self.message_buffer) > self.max_messages:
-            self.message_buffer.pop(0)
+        seq = self.message_buffer.append(Message(clock.time_str, message_type, message))
+        self.search_index.add('Mensagem', seq, message)
+        self.search_index.discard_before('Mensagem', self.message_buffer.first)
+        self.ui_dirty.set()
+    
+    def connection_event(self, state, detail):
+        self.link_state = state
+        self.connection_history.append({
+            'host': self.host,
+            'port': self.port,
+            'time': clock.datetime_str,
+            'status': detail
+        })
+        self.add_message(f"[{state.upper()}] {detail}", "event")
+    
+    def begin_reconnect(self):
+        self.reconnect_wake.clear()
+        self.connection_event('reconectando', "Conexao perdida")
+        if self.reconnect_backoff.attempts >= self.max_reconnect_attempts:
+            # Caiu de novo antes do primeiro prompt: conta como tentativa falha
+            self.abandon_reconnect()
+            return
+        reconnect_thread = threading.Thread(target=self.reconnect_loop, name="reconexao")
+        reconnect_thread.daemon = True
+        reconnect_thread.start()
+    
+    def stop_reconnect(self):
+        if self.link_state != 'reconectando':
+            return
+        self.link_state = 'desconectado'
+        self.outbox.clear()
+        self.reconnect_wake.set()
+        self.ui_dirty.set()
+    
+    def abandon_reconnect(self):
+        dropped = len(self.outbox)
+        self.outbox.clear()
+        self.connection_event('desconectado', f"Reconexao abandonada apos {self.reconnect_backoff.attempts} tentativas ({dropped} comandos descartados)")
+    
+    def reconnect_loop(self):
+        backoff = self.reconnect_backoff
+        delay = backoff.next_delay()
+        while True:
+            # :reconnect acorda a espera para tentar na hora
+            self.reconnect_wake.wait(delay)
+            self.reconnect_wake.clear()
+            if self.link_state != 'reconectando':
+                return
+            
+            try:
+                self.connection.connect(self.host, self.port, timeout=5)
+            except OSError as e:
+                if backoff.attempts >= self.max_reconnect_attempts:
+                    self.abandon_reconnect()
+                    return
+                delay = backoff.next_delay()
+                self.connection_event('reconectando', f"Tentativa {backoff.attempts - 1} falhou ({e}); nova tentativa em {delay:.1f}s")
+                continue
+            
+            self.connected = True
+            self.connection_time = time.time()
+            # Estado antes da thread de recepção: se o servidor fechar logo em
+            # seguida ela precisa ver 'conectado' para iniciar outra reconexão
+            self.connection_event('conectado', f"Reconectado apos {backoff.attempts} tentativa(s)")
+            self.start_receiving()
+            self.flush_outbox()
+            return
+    
+    def queue_command(self, command):
+        if len(self.outbox) >= self.max_queued_commands:
+            self.add_message(f"Fila cheia ({self.max_queued_commands}); comando descartado: {command}", "event")
+            return
+        self.outbox.append(command)
+        self.add_message(f"Na fila ({len(self.outbox)}/{self.max_queued_commands}); sera enviado ao reconectar", "event")
+    
+    def flush_outbox(self):
+        if self.outbox:
+            self.add_message(f"Reenviando {len(self.outbox)} comando(s) da fila", "event")
+        while self.connected:
+            # Retira antes de enviar: stop_reconnect e o abandono podem esvaziar
+            # a fila de outra thread enquanto send_command espera a resposta
+            try:
+                command = self.outbox.popleft()
+            except IndexError:
+                return
+            try:
+                self.send_command(command)
+            except OSError:
+                # Volta para a frente da fila; a thread de recepção percebe a
+                # queda e inicia outra reconexão
+                self.outbox.appendleft(command)
+                return
+    
+    def start_recording(self, console=None):
+        console = console or self.console
+        if self.recorder and self.recorder.running:
+            return
+        
+        try:
+            self.recorder = SessionRecorder(**self.recorder_options).start()
+            self.print_success(f"Gravando sessao em {self.recorder.directory}", console=console)
+        except OSError as e:
+            self.recorder = None
+            self.print_error(f"Erro ao iniciar gravacao: {e}", console=console)
+    
+    def stop_recording(self, console=None):
+        console = console or self.console
+        if not self.recorder:
+            return
+        
+        recorder = self.recorder
+        self.recorder = None
+        recorder.stop()
+        
+        message = f"Gravacao encerrada: {recorder.lines} linhas em {len(recorder.segments)} arquivo(s)"
+        if recorder.dropped:
+            message += f", {recorder.dropped} descartadas"
+        self.print_success(message, console=console)
+        if recorder.error:
+            self.print_error(f"Erro na gravacao: {recorder.error}", console=console)
+    
+    def toggle_command_recording(self, console=None):
+        console = console or self.console
+        if self.command_recording:
+            recording = self.command_recording
+            self.command_recording = None
+            recording.close()
+            self.print_success(f"Gravacao de comandos salva: {recording.path} ({recording.count} comandos)", console=console)
+            console.print(f"[dim]Reproduza com: python cliente_replay.py {recording.path}[/dim]")
+            return
+        
+        try:
+            self.command_recording = CommandRecording(unique_path('.', 'workload', '.ndjson'), self.host, self.port)
+            self.print_success(f"Gravando comandos em {self.command_recording.path}", console=console)
+        except OSError as e:
+            self.print_error(f"Erro ao iniciar gravacao: {e}", console=console)
+    
+    def clear_messages(self):
+        self.message_buffer.clear()
+        self.search_index.discard_before('Mensagem', self.message_buffer.first)
+        self.ui_dirty.set()
+    
+    def render_message(self, message):
+        if message.direction == "command":
+            return f"[dim]{message.time}[/dim] [bold blue]>[/bold blue] [cyan]{escape(message.text)}[/cyan]"
+        if message.direction == "event":
+            return f"[dim]{message.time}[/dim] [bold yellow]*[/bold yellow] [yellow]{escape(message.text)}[/yellow]"
+        return f"[dim]{message.time}[/dim] [bold green]<[/bold green] {escape(message.text)}"
     
     def format_conversation(self, limit=10):
         if not self.message_buffer:
             return "Nenhuma mensagem ainda..."
         
-        recent_messages = self.message_buffer[-limit:]
-        return "\n".join(recent_messages)
+        recent_messages = self.message_buffer.tail(limit)
+        return "\n".join(self.render_message(message) for message in recent_messages)
     
-    def show_terminal_commands_banner(self):
+    def show_terminal_commands_banner(self, console=None):
+        console = console or self.console
         commands_table = Table(show_header=True, box=box.ROUNDED, border_style="cyan")
         commands_table.add_column("Comando", style="bold yellow", width=18)
         commands_table.add_column("Descricao", style="white")
@@ -269,145 +656,245 @@ class TechUnisenacClient:
         commands_table.add_row("[bold cyan]CLIENTE[/bold cyan]", "")
         commands_table.add_row(":quit", "Sair do programa")
         commands_table.add_row(":clear", "Limpar terminal")
-        commands_table.add_row(":history", "Ver historico de comandos")
+        commands_table.add_row(":help", "Mostrar esta tabela")
+        commands_table.add_row(escape(":history [prefixo]"), "Historico (da sessao ou por prefixo)")
         commands_table.add_row(":info", "Info e estatisticas")
-        commands_table.add_row(":note [msg]", "Adicionar anotacao")
-        commands_table.add_row(":export", "Exportar dados da sessao")
+        commands_table.add_row(escape(":note [msg]"), "Adicionar anotacao")
+        commands_table.add_row(escape(":export [gz] [novo]"), "Exportar sessao (NDJSON, gzip, so o novo)")
+        commands_table.add_row(":save", "Salvar o scrollback em arquivo")
+        commands_table.add_row(":log", "Ligar/desligar gravacao continua")
+        commands_table.add_row(":rec", "Gravar comandos para replay")
+        commands_table.add_row(":timers", "Ver timers e lembretes")
         commands_table.add_row(":reconnect", "Reconectar ao servidor")
+        commands_table.add_row(escape(":search [termo] [-p N]"), "Buscar (termo, pref*, /regex/)")
         
         commands_table.add_row("", "")
         
         commands_table.add_row("[bold green]SERVIDOR[/bold green]", "")
         commands_table.add_row("status", "Status do sistema")
         commands_table.add_row("users", "Usuarios conectados")
-        commands_table.add_row("ping [host]", "Teste de conectividade")
+        commands_table.add_row(escape("ping [host]"), "Teste de conectividade")
         commands_table.add_row("time", "Data e hora")
         commands_table.add_row("whoami", "Suas informacoes")
         commands_table.add_row("uptime", "Tempo ativo do servidor")
         commands_table.add_row("quit", "Sair do servidor")
         
-        self.console.print(Panel(
+        console.print(Panel(
             commands_table,
             title="[bold]Comandos Disponiveis[/bold]",
             border_style="cyan"
         ))
-        self.console.print()
+        console.print()
     
-    def show_session_notes_panel(self):
+    def show_session_notes_panel(self, console=None):
+        console = console or self.console
         if self.session_notes:
             notes_text = ""
             for note in self.session_notes[-3:]:
-                notes_text += f"[dim]{note['time']}[/dim] [bold blue]NOTA:[/bold blue] [yellow]{note['note']}[/yellow]\n"
+                notes_text += f"[dim]{note['time']}[/dim] [bold blue]NOTA:[/bold blue] [yellow]{escape(note['note'])}[/yellow]\n"
             
-            self.console.print(Panel(
+            console.print(Panel(
                 notes_text.strip(),
                 title="[bold]Anotacoes da Sessao[/bold]",
                 border_style="yellow"
             ))
-            self.console.print()
+            console.print()
 
+    def print_terminal_header(self, console=None):
+        console = console or self.console
+        console.print(Panel(
+            f"[bold cyan]Terminal Conectado - {self.host}:{self.port}[/bold cyan]\n"
+            "[yellow]Digite comandos para interagir com o servidor[/yellow]\n"
+            "[dim]Use os comandos da tabela abaixo; Enter em branco fecha este painel e :help o reabre[/dim]",
+            border_style="cyan",
+            title="Terminal Ativo"
+        ))
+        console.print()
+        
+        self.show_session_notes_panel(console=console)
+        self.show_terminal_commands_banner(console=console)
+    
+    def capture_output(self, func, *args):
+        # Saída de comandos ':' vai para um painel dentro do Live; impressa
+        # acima dele, rolaria para fora da tela. O console de gravação vai como
+        # argumento: self.console segue sendo a tela para as outras threads
+        buffer = io.StringIO()
+        console = Console(file=buffer, width=max(self.console.width - 4, 20), force_terminal=True,
+                          color_system=self.console.color_system)
+        result = func(*args, console=console)
+        self.terminal_result = Text.from_ansi(buffer.getvalue().rstrip())
+        self.ui_dirty.set()
+        return result
+    
+    def render_terminal(self, console=None):
+        # Live ocupa a tela inteira menos 3 linhas; o resultado de ':' divide
+        # esse espaço com a conversa
+        height = (console or self.console).height
+        available = max(height - 8, 5)
+        panels = []
+        
+        if self.terminal_result is not None:
+            result_lines = self.terminal_result.split()
+            shown = min(len(result_lines), max(available - 7, 3))
+            hidden = len(result_lines) - shown
+            panels.append(Panel(
+                Text("\n").join(result_lines[:shown]),
+                title="[bold]Resultado[/bold]",
+                subtitle=f"[dim]{f'+{hidden} linhas - ' if hidden else ''}Enter em branco fecha[/dim]",
+                border_style="blue",
+                height=shown + 2
+            ))
+            available = max(available - shown - 2, 3)
+        
+        conversation = Panel(
+            self.format_conversation(available),
+            title="[bold]Conversacao[/bold]",
+            border_style="green",
+            height=available + 2
+        )
+        panels.insert(0, conversation)
+        
+        input_text = Text("> ", style="bold cyan")
+        input_text.append(self.line_input.text if self.line_input else "")
+        input_text.append("█", style="blink")
+        if self.line_input and self.line_input.suggestion:
+            input_text.append(self.line_input.suggestion[len(self.line_input.text):], style="dim")
+            input_text.append("  [Tab]", style="dim cyan")
+        
+        if self.connected and self.awaiting_response:
+            status = f"[yellow]aguardando resposta...[/yellow] [green]{self.host}:{self.port}[/green]"
+        elif self.connected:
+            status = f"[green]{self.host}:{self.port}[/green]"
+        elif self.link_state == 'reconectando':
+            status = f"[yellow]RECONECTANDO[/yellow] [dim]{len(self.outbox)} na fila[/dim]"
+        else:
+            status = "[red]DESCONECTADO[/red]"
+        
+        return Group(*panels, Panel(input_text, title="[bold]Comando[/bold]", subtitle=status, border_style="cyan"))
+    
+    def terminal_render_loop(self, live, stop):
+        # Redesenha só quando há novidade; o sleep depois de cada quadro agrupa
+        # rajadas de mensagens em um único refresh (limite de max_fps)
+        frame_interval = 1.0 / self.max_fps
+        while not stop.is_set():
+            if not self.ui_dirty.wait(0.5):
+                continue
+            self.ui_dirty.clear()
+            with self.render_lock:
+                if live.is_started:
+                    live.update(self.render_terminal(live.console), refresh=True)
+            time.sleep(frame_interval)
+    
+    def complete_command(self, prefix):
+        # Sugere o comando mais usado (e recente) do histórico que começa com o texto digitado
+        for command, _, _ in self.command_store.complete(prefix, 1):
+            if command != prefix:
+                return command
+        return ""
+    
     def terminal_mode(self):
         if not self.connected:
             self.print_error("Voce precisa estar conectado!")
             return
         
-        self.message_buffer = []
+        self.clear_messages()
         self.print_loading("Iniciando terminal", 1.5)
         
         self.clear_screen()
+        self.capture_output(self.print_terminal_header)
         
-        self.show_session_notes_panel()
-        
-        self.show_terminal_commands_banner()
-        
-        self.console.print(Panel(
-            f"[bold cyan]Terminal Conectado - {self.host}:{self.port}[/bold cyan]\n"
-            "[yellow]Digite comandos para interagir com o servidor[/yellow]\n"
-            "[dim]Use os comandos da tabela acima[/dim]",
-            border_style="cyan",
-            title="Terminal Ativo"
-        ))
-        self.console.print()
+        self.command_store.preload()
+        self.line_input = LineInput(on_change=self.ui_dirty.set, completer=self.complete_command)
+        stop_render = threading.Event()
+        live = Live(self.render_terminal(), console=self.console, auto_refresh=False)
         
         try:
-            while self.connected:
-                if self.message_buffer:
-                    conversation = self.format_conversation(8)
-                    self.console.print(Panel(
-                        conversation,
-                        title="[bold]Conversacao[/bold]",
-                        border_style="green"
-                    ))
-                    self.console.print()
-                
+            live.start()
+            render_thread = threading.Thread(target=self.terminal_render_loop, args=(live, stop_render), name="render")
+            render_thread.daemon = True
+            render_thread.start()
+            self.line_input.start()
+            
+            while self.connected or self.link_state == 'reconectando':
                 try:
-                    user_input = questionary.text(
-                        "> Comando:",
-                        qmark=""
-                    ).ask()
+                    try:
+                        user_input = self.line_input.get(timeout=0.2)
+                    except queue.Empty:
+                        continue
                     
                     if user_input is None:
                         break
                     
                     user_input = user_input.strip()
+                    if user_input:
+                        self.command_store.add(user_input)
                     
                     if user_input == ':quit':
                         break
                     elif user_input == ':clear':
-                        self.message_buffer = []
-                        self.clear_screen()
-                        self.show_session_notes_panel()
-                        self.show_terminal_commands_banner()
-                        
-                        self.console.print(Panel(
-                            "[bold green]Terminal limpo![/bold green]",
-                            border_style="green"
-                        ))
+                        self.clear_messages()
+                        self.capture_output(lambda console: console.print("[bold green]Terminal limpo![/bold green]"))
+                        continue
+                    elif user_input == ':help':
+                        self.capture_output(self.print_terminal_header)
                         continue
                     elif user_input.startswith(':'):
-                        if self.handle_terminal_command(user_input):
-                            continue
-                        else:
-                            self.console.print(f"[red]Comando desconhecido: {user_input}[/red]")
-                            continue
+                        if not self.capture_output(self.handle_terminal_command, user_input):
+                            self.capture_output(lambda console: console.print(f"[red]Comando desconhecido: {escape(user_input)}[/red]"))
+                        continue
                     elif user_input == '':
+                        self.terminal_result = None
+                        self.ui_dirty.set()
                         continue
                     
                     self.command_history.append({
                         'command': user_input,
-                        'time': datetime.now().strftime('%H:%M:%S')
+                        'time': clock.time_str
                     })
+                    self.search_index.add('Comando', len(self.command_history) - 1, user_input)
                     
                     self.add_message(user_input, "command")
                     
-                    if user_input.lower() in ['quit', 'exit', 'bye', 'sair']:
-                        if self.socket:
-                            self.socket.send(f"{user_input}\n".encode('utf-8'))
-                            time.sleep(1)
+                    if user_input.lower() in QUIT_COMMANDS:
+                        self.closing = True
+                        self.stop_reconnect()
+                        if self.connection.sock and self.connected:
+                            self.session_stats['bytes_sent'] += self.connection.send(user_input)
+                            self.connection_closed.wait(self.response_timeout)
                         break
                     
-                    if self.socket and self.connected:
-                        command_bytes = f"{user_input}\n".encode('utf-8')
-                        self.socket.send(command_bytes)
-                        self.session_stats['bytes_sent'] += len(command_bytes)
-                    
-                    time.sleep(0.8)
-                    
-                    self.clear_screen()
-                    self.show_session_notes_panel()
-                    self.show_terminal_commands_banner()
+                    if self.link_state == 'reconectando' or self.outbox:
+                        self.queue_command(user_input)
+                    elif self.connection.sock and self.connected:
+                        self.awaiting_response = True
+                        self.ui_dirty.set()
+                        try:
+                            self.send_command(user_input)
+                        except OSError:
+                            self.queue_command(user_input)
+                        finally:
+                            self.awaiting_response = False
+                            self.ui_dirty.set()
                 
                 except (EOFError, KeyboardInterrupt):
                     break
                 
         except Exception as e:
             self.print_error(f"Erro no terminal: {e}")
+        finally:
+            self.line_input.stop()
+            stop_render.set()
+            self.terminal_result = None
+            with self.render_lock:
+                live.update(self.render_terminal(live.console), refresh=True)
+                live.stop()
         
         self.console.print(Panel(
             "[bold yellow]Saindo do terminal...[/bold yellow]",
             border_style="yellow"
         ))
         
+        self.stop_reconnect()
         if self.connected:
             self.disconnect_from_server()
         
@@ -442,22 +929,78 @@ class TechUnisenacClient:
         
         questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
     
+    def render_sweep(self, stats, count):
+        sweep_table = Table(show_header=True, box=box.ROUNDED, border_style="blue")
+        sweep_table.add_column("Alvo", style="bold cyan")
+        sweep_table.add_column("Tentativas", justify="right")
+        sweep_table.add_column("Min", justify="right", style="green")
+        sweep_table.add_column("Media", justify="right", style="yellow")
+        sweep_table.add_column("p95", justify="right", style="magenta")
+        sweep_table.add_column("Falhas", style="red")
+        
+        # Alvos mais lentos no topo; os sem nenhuma conexão bem-sucedida por último
+        def order(item):
+            summary = item[1].summary()
+            return (summary is None, -summary[2] if summary else 0)
+        
+        for (host, port), target_stats in sorted(stats.items(), key=order):
+            summary = target_stats.summary()
+            timings = [f"{value:.2f}ms" for value in summary] if summary else ["-", "-", "-"]
+            failures = ", ".join(f"{reason} x{total}" for reason, total in target_stats.failures.items())
+            sweep_table.add_row(f"{host}:{port}", f"{target_stats.attempts}/{count}", *timings, failures)
+        return sweep_table
+    
     def test_connection(self):
         self.console.print(Panel("[bold cyan]Teste de Conexao[/bold cyan]", border_style="cyan"))
         self.console.print()
         
         try:
-            self.print_loading(f"Testando conexao com {self.host}:{self.port}", 2)
+            targets_text = questionary.text(
+                "Alvos (host:porta, faixas como host:2323-2330):",
+                default=f"{self.host}:{self.port}"
+            ).ask()
+            if not targets_text:
+                return
             
-            test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            test_socket.settimeout(5)
-            test_socket.connect((self.host, self.port))
-            test_socket.close()
+            count = questionary.text(
+                "Conexoes por alvo:",
+                default="5",
+                validate=lambda x: x.isdigit() and 1 <= int(x) <= 1000
+            ).ask()
+            if count is None:
+                return
+            count = int(count)
             
-            self.print_success(f"Conexao com {self.host}:{self.port} OK!")
+            try:
+                targets = expand_targets(targets_text, self.port)
+            except ValueError:
+                self.print_error("Porta ou faixa de portas invalida")
+                return
             
-        except Exception as e:
-            self.print_error(f"Falha na conexao: {e}")
+            stats = {target: None for target in targets}
+            started = time.perf_counter()
+            
+            def on_result(target, target_stats):
+                stats[target] = target_stats
+            
+            def renderable():
+                visible = {target: target_stats for target, target_stats in stats.items() if target_stats}
+                return self.render_sweep(visible, count)
+            
+            with Live(get_renderable=renderable, console=self.console, refresh_per_second=8):
+                stats = asyncio.run(connect_sweep(targets, count, on_result=on_result))
+            self.console.print()
+            
+            elapsed = time.perf_counter() - started
+            failed = sum(1 for target_stats in stats.values() if not target_stats.samples)
+            message = f"{len(targets)} alvos x {count} conexoes em {elapsed:.2f}s"
+            if failed:
+                self.print_warning(f"{message}; {failed} alvo(s) sem nenhuma conexao")
+            else:
+                self.print_success(message)
+        
+        except (EOFError, KeyboardInterrupt):
+            self.console.print("[yellow]Operacao cancelada[/yellow]")
         
         questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
     
@@ -490,8 +1033,37 @@ class TechUnisenacClient:
         
         questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
     
+    def show_calculator_batch(self, args):
+        parts = args.split(None, 2)
+        if len(parts) < 3:
+            self.console.print("[yellow]Uso: :lote <variavel> <inicio:fim[:passo] | v1,v2,...> <expressao>[/yellow]")
+            return
+        
+        name, values_text, expression = parts
+        started = time.perf_counter()
+        values, results, mode = self.calculator.batch(name, values_text, expression)
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        batch_table = Table(show_header=True, box=box.ROUNDED, border_style="green")
+        batch_table.add_column(name, style="bold cyan", justify="right")
+        batch_table.add_column(expression, style="yellow", justify="right")
+        
+        shown = 50
+        for value, result in zip(values[:shown], results[:shown]):
+            batch_table.add_row(f"{value:g}" if isinstance(value, float) else str(value), f"{result:.10g}" if isinstance(result, float) else str(result))
+        if len(values) > shown:
+            batch_table.add_row("...", f"[dim]+{len(values) - shown} valores[/dim]")
+        
+        self.console.print(Panel(
+            batch_table,
+            title=f"[bold]Lote: {len(values)} valores[/bold]",
+            subtitle=f"[dim]{mode} - {elapsed:.1f}ms[/dim]",
+            border_style="green"
+        ))
+    
     def show_calculator(self):
         self.console.print(Panel("[bold cyan]Calculadora Simples[/bold cyan]", border_style="cyan"))
+        self.console.print("[dim]Variaveis: x = 2 | ultimo resultado: ans | funcoes: sqrt, sin, log, ... | :lote x 0:10 x^2 | :vars[/dim]")
         self.console.print()
         
         try:
@@ -504,19 +1076,23 @@ class TechUnisenacClient:
                 if expression is None or expression.lower() in ['sair', 'exit', 'quit']:
                     break
                 
-                if not expression.strip():
+                expression = expression.strip()
+                if not expression:
                     continue
                 
                 try:
-                    # Permitir apenas operações matemáticas básicas
-                    allowed_chars = set('0123456789+-*/().,e ')
-                    if all(c in allowed_chars for c in expression.replace(' ', '')):
-                        result = eval(expression)
-                        self.console.print(f"[bold green]Resultado:[/bold green] [yellow]{result}[/yellow]")
+                    if expression == ':vars':
+                        variables = self.calculator.variables
+                        listing = ", ".join(f"{name} = {value}" for name, value in variables.items())
+                        self.console.print(f"[cyan]{listing or 'Nenhuma variavel definida'}[/cyan]")
+                    elif expression.startswith(':lote'):
+                        self.show_calculator_batch(expression[len(':lote'):])
                     else:
-                        self.console.print("[red]Erro: Apenas operações matemáticas básicas são permitidas[/red]")
+                        target, result = self.calculator.evaluate(expression)
+                        label = "Resultado" if target == 'ans' else target
+                        self.console.print(f"[bold green]{label}:[/bold green] [yellow]{result}[/yellow]")
                 
-                except Exception as e:
+                except CalcError as e:
                     self.console.print(f"[red]Erro na expressão: {e}[/red]")
                 
                 self.console.print()
@@ -524,81 +1100,188 @@ class TechUnisenacClient:
         except (EOFError, KeyboardInterrupt):
             pass
     
-    def show_system_info(self):
-        import platform
-        import psutil
+    def render_system_info(self, sampler):
+        facts = platform_facts()
+        latest = sampler.latest()
         
         info_table = Table(show_header=False, box=box.ROUNDED, border_style="blue")
         info_table.add_column("Item", style="bold cyan", width=20)
-        info_table.add_column("Valor", style="white")
-        
-        info_table.add_row("Sistema", platform.system())
-        info_table.add_row("Versao", platform.release())
-        info_table.add_row("Arquitetura", platform.machine())
-        info_table.add_row("Processador", platform.processor()[:50] + "..." if len(platform.processor()) > 50 else platform.processor())
-        
-        try:
-            info_table.add_row("CPU Uso", f"{psutil.cpu_percent(interval=1):.1f}%")
-            info_table.add_row("Memoria", f"{psutil.virtual_memory().percent:.1f}%")
-            info_table.add_row("Disco", f"{psutil.disk_usage('/').percent:.1f}%")
-        except:
-            info_table.add_row("Recursos", "Informacao nao disponivel")
-        
-        info_table.add_row("Python", platform.python_version())
-        info_table.add_row("Hostname", platform.node())
-        
-        self.console.print(Panel(
+        info_table.add_column("Valor", style="white", width=24)
+        info_table.add_column("Historico", style="green")
+        
+        info_table.add_row("Sistema", facts['system'], "")
+        info_table.add_row("Versao", facts['release'], "")
+        info_table.add_row("Arquitetura", facts['machine'], "")
+        info_table.add_row("Processador", facts['processor'][:50] + "..." if len(facts['processor']) > 50 else facts['processor'], "")
+        info_table.add_row("Nucleos", str(facts['cpu_count']), "")
+        if facts['mem_total']:
+            info_table.add_row("Memoria Total", f"{facts['mem_total'] / 1024 ** 3:.1f} GB", "")
+        
+        percent = lambda value: f"{value:.1f}%"
+        # Percentuais em escala fixa 0-100; os demais relativos ao próprio histórico
+        metrics = (
+            ("CPU Uso", 'cpu', percent, 100),
+            ("Memoria", 'memory', percent, 100),
+            ("Disco", 'disk', percent, 100),
+            ("Carga (1 min)", 'load', lambda value: f"{value:.2f}", None),
+            ("Rede Envio", 'net_sent', format_rate, None),
+            ("Rede Recepcao", 'net_received', format_rate, None)
+        )
+        for label, key, formatter, high in metrics:
+            value = latest.get(key)
+            info_table.add_row(
+                label,
+                formatter(value) if value is not None else "[dim]coletando...[/dim]",
+                sparkline(sampler.history(key), 0 if high else None, high)
+            )
+        
+        info_table.add_row("Python", facts['python'], "")
+        info_table.add_row("Hostname", facts['hostname'], "")
+        
+        return Panel(
             info_table,
             title="[bold]Informacoes do Sistema[/bold]",
+            subtitle=f"[dim]amostra a cada {sampler.interval:g}s - Enter para voltar[/dim]",
             border_style="blue"
-        ))
+        )
+    
+    def show_system_info(self):
+        # O amostrador continua rodando depois da primeira visita, então o
+        # histórico já está pronto nas próximas
+        if self.system_sampler is None:
+            self.system_sampler = SystemSampler()
+        sampler = self.system_sampler.start()
+        
+        line_input = LineInput()
+        with Live(get_renderable=lambda: self.render_system_info(sampler), console=self.console, refresh_per_second=2):
+            line_input.start()
+            try:
+                while True:
+                    try:
+                        line_input.get(timeout=0.5)
+                        break
+                    except queue.Empty:
+                        continue
+            except KeyboardInterrupt:
+                pass
+            finally:
+                line_input.stop()
+    
+    def on_timer_fired(self, entry):
+        if entry.kind == 'lembrete':
+            text = f"Lembrete '{entry.name}' (#{entry.fired})"
+        else:
+            text = f"Timer '{entry.name}' finalizado"
+        self.notifications.append((clock.time_str, text))
+        self.add_message(f"[TIMER] {text}", "event")
+        self.console.bell()
+    
+    def render_timer_status(self):
+        timers_table = Table(show_header=True, box=box.ROUNDED, border_style="blue")
+        timers_table.add_column("#", style="dim", width=4)
+        timers_table.add_column("Nome", style="bold cyan")
+        timers_table.add_column("Tipo")
+        timers_table.add_column("Tempo", justify="right", style="yellow")
+        timers_table.add_column("Estado")
+        
+        now = time.monotonic()
+        for entry in self.scheduler.snapshot():
+            if entry.kind == 'cronometro':
+                shown = f"{entry.elapsed(now):.1f}s"
+            elif entry.active:
+                shown = f"{entry.remaining(now):.1f}s restantes"
+            else:
+                shown = "-"
+            
+            if entry.kind == 'lembrete':
+                state = f"a cada {entry.interval:g}s, {entry.fired} avisos" if entry.active else f"parado, {entry.fired} avisos"
+            else:
+                state = "[green]ativo[/green]" if entry.active else ("[dim]finalizado[/dim]" if entry.fired else "[dim]parado[/dim]")
+            timers_table.add_row(str(entry.id), escape(entry.name), entry.kind, shown, state)
         
-        questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
+        return Panel(timers_table, title="[bold]Timers[/bold]", border_style="blue")
     
     def show_timer(self):
         self.console.print(Panel("[bold cyan]Cronometro/Timer[/bold cyan]", border_style="cyan"))
         self.console.print()
         
-        timer_choice = questionary.select(
-            "Escolha uma opcao:",
-            choices=[
-                {"name": "Cronometro da Sessao", "value": "session"},
-                {"name": "Timer Personalizado", "value": "custom"},
-                {"name": "Voltar", "value": "back"}
-            ]
-        ).ask()
-        
-        if timer_choice == "session":
-            self.show_session_timer()
-            questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
-        
-        elif timer_choice == "custom":
-            try:
-                seconds = questionary.text(
-                    "Digite o tempo em segundos:",
-                    validate=lambda x: x.isdigit() and int(x) > 0
+        try:
+            while True:
+                timer_choice = questionary.select(
+                    "Escolha uma opcao:",
+                    choices=[
+                        {"name": "Cronometro da Sessao", "value": "session"},
+                        {"name": "Novo Timer", "value": "timer"},
+                        {"name": "Novo Lembrete Recorrente", "value": "reminder"},
+                        {"name": "Novo Cronometro", "value": "stopwatch"},
+                        {"name": "Ver Timers", "value": "status"},
+                        {"name": "Parar Timer/Cronometro", "value": "stop"},
+                        {"name": "Voltar", "value": "back"}
+                    ]
                 ).ask()
                 
-                if seconds:
-                    countdown_time = int(seconds)
-                    self.console.print(f"[cyan]Iniciando timer de {countdown_time} segundos...[/cyan]")
+                if timer_choice in (None, "back"):
+                    break
+                
+                if timer_choice == "session":
+                    self.show_session_timer()
+                
+                elif timer_choice == "status":
+                    self.console.print(self.render_timer_status())
+                
+                elif timer_choice == "stop":
+                    running = [entry for entry in self.scheduler.snapshot() if entry.active]
+                    if not running:
+                        self.console.print("[yellow]Nenhum timer ativo[/yellow]")
+                        continue
                     
-                    with Progress(
-                        SpinnerColumn(),
-                        TextColumn("[progress.description]{task.description}"),
-                        console=self.console
-                    ) as progress:
-                        task = progress.add_task(f"Timer: {countdown_time}s restantes", total=None)
-                        
-                        for i in range(countdown_time, 0, -1):
-                            progress.update(task, description=f"Timer: {i}s restantes")
-                            time.sleep(1)
+                    entry_id = questionary.select(
+                        "Parar qual?",
+                        choices=[{"name": f"#{entry.id} {entry.name} ({entry.kind})", "value": entry.id} for entry in running]
+                    ).ask()
+                    entry = self.scheduler.stop(entry_id) if entry_id is not None else None
+                    if entry and entry.kind == 'cronometro':
+                        self.console.print(f"[green]Cronometro '{escape(entry.name)}' parado em {entry.elapsed():.1f}s[/green]")
+                    elif entry:
+                        self.console.print(f"[green]'{escape(entry.name)}' parado[/green]")
+                    self.scheduler.remove_finished()
+                
+                else:
+                    name = questionary.text("Nome:", default=f"{timer_choice} {len(self.scheduler.entries) + 1}").ask()
+                    if name is None:
+                        continue
                     
-                    self.console.print("[bold green]Timer finalizado![/bold green] ⏰")
-                    questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
-            
-            except (EOFError, KeyboardInterrupt):
-                self.console.print("[yellow]Timer cancelado[/yellow]")
+                    if timer_choice == "stopwatch":
+                        self.scheduler.add_stopwatch(name)
+                        self.console.print(f"[green]Cronometro '{escape(name)}' iniciado[/green]")
+                        continue
+                    
+                    duration = questionary.text(
+                        "Duracao (ex.: 90, 1m30s, 2h):" if timer_choice == "timer" else "Intervalo (ex.: 30s, 5m):",
+                        validate=self.validate_duration
+                    ).ask()
+                    if duration is None:
+                        continue
+                    
+                    seconds = parse_duration(duration)
+                    if timer_choice == "timer":
+                        self.scheduler.add_timer(name, seconds)
+                        self.console.print(f"[green]Timer '{escape(name)}' de {seconds:g}s iniciado em segundo plano[/green]")
+                    else:
+                        self.scheduler.add_reminder(name, seconds)
+                        self.console.print(f"[green]Lembrete '{escape(name)}' a cada {seconds:g}s[/green]")
+                
+                self.console.print()
+        
+        except (EOFError, KeyboardInterrupt):
+            self.console.print("[yellow]Operacao cancelada[/yellow]")
+    
+    def validate_duration(self, text):
+        try:
+            parse_duration(text)
+            return True
+        except ValueError as e:
+            return str(e)
     
     def show_notepad(self):
         self.console.print(Panel("[bold cyan]Bloco de Notas da Sessao[/bold cyan]", border_style="cyan"))
@@ -656,7 +1339,7 @@ class TechUnisenacClient:
                         filename = f"notas_sessao_{timestamp}.txt"
                         
                         with open(filename, 'w', encoding='utf-8') as f:
-                            f.write(f"NOTAS DA SESSAO - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+                            f.write(f"NOTAS DA SESSAO - {clock.datetime_str}\n")
                             f.write("=" * 50 + "\n\n")
                             
                             for i, note in enumerate(self.session_notes, 1):
@@ -676,6 +1359,7 @@ class TechUnisenacClient:
                     
                     if confirm:
                         self.session_notes.clear()
+                        self.search_index.discard_kind('Nota')
                         self.console.print("[green]Todas as notas foram removidas[/green]")
                 else:
                     self.console.print("[yellow]Nenhuma nota para limpar[/yellow]")
@@ -688,6 +1372,18 @@ class TechUnisenacClient:
         self.console.print()
         
         try:
+            mode = questionary.select(
+                "Modo:",
+                choices=[
+                    {"name": "Uma senha", "value": "single"},
+                    {"name": "Lote (arquivo ou tela)", "value": "bulk"},
+                    {"name": "Voltar", "value": "back"}
+                ]
+            ).ask()
+            
+            if mode in (None, "back"):
+                return
+            
             length = questionary.text(
                 "Comprimento da senha (default: 12):",
                 default="12",
@@ -700,7 +1396,7 @@ class TechUnisenacClient:
             length = int(length)
             
             include_options = questionary.checkbox(
-                "Incluir:",
+                "Incluir (ao menos um caractere de cada classe marcada):",
                 choices=[
                     {"name": "Letras minusculas (a-z)", "value": "lower", "checked": True},
                     {"name": "Letras maiusculas (A-Z)", "value": "upper", "checked": True},
@@ -713,90 +1409,148 @@ class TechUnisenacClient:
                 self.console.print("[yellow]Nenhuma opcao selecionada[/yellow]")
                 return
             
-            import string
-            
-            chars = ""
-            if "lower" in include_options:
-                chars += string.ascii_lowercase
-            if "upper" in include_options:
-                chars += string.ascii_uppercase
-            if "digits" in include_options:
-                chars += string.digits
-            if "symbols" in include_options:
-                chars += "!@#$%^&*()_+-=[]{}|;:,.<>?"
-            
-            if not chars:
-                self.console.print("[red]Erro: Nenhum caractere disponivel[/red]")
+            try:
+                generator = PasswordGenerator(length, include_options)
+            except ValueError as e:
+                self.console.print(f"[red]Erro: {e}[/red]")
                 return
             
-            password = ''.join(random.choice(chars) for _ in range(length))
+            bits = generator.entropy_bits()
             
-            password_table = Table(show_header=False, box=box.ROUNDED, border_style="green")
-            password_table.add_column("Item", style="bold cyan", width=15)
-            password_table.add_column("Valor", style="white")
-            
-            password_table.add_row("Senha Gerada", f"[bold yellow]{password}[/bold yellow]")
-            password_table.add_row("Comprimento", str(length))
-            password_table.add_row("Caracteres", ", ".join(include_options))
-            
-            self.console.print(Panel(
-                password_table,
-                title="[bold]Senha Gerada[/bold]",
-                border_style="green"
-            ))
-            
-            save_option = questionary.confirm(
-                "Deseja salvar a senha em um arquivo?",
-                default=False
-            ).ask()
-            
-            if save_option:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"senha_{timestamp}.txt"
-                
-                try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(f"Senha gerada em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-                        f.write(f"Comprimento: {length}\n")
-                        f.write(f"Opcoes: {', '.join(include_options)}\n")
-                        f.write(f"Senha: {password}\n")
-                    
-                    self.console.print(f"[green]Senha salva em: {filename}[/green]")
-                
-                except Exception as e:
-                    self.console.print(f"[red]Erro ao salvar: {e}[/red]")
+            if mode == "bulk":
+                self.generate_password_batch(generator, bits)
+            else:
+                self.show_single_password(generator, bits, include_options)
         
         except (EOFError, KeyboardInterrupt):
             self.console.print("[yellow]Operacao cancelada[/yellow]")
         
         questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
     
-    def handle_terminal_command(self, command):
+    def show_single_password(self, generator, bits, include_options):
+        password = generator.generate()
+        
+        password_table = Table(show_header=False, box=box.ROUNDED, border_style="green")
+        password_table.add_column("Item", style="bold cyan", width=15)
+        password_table.add_column("Valor", style="white")
+        
+        password_table.add_row("Senha Gerada", f"[bold yellow]{escape(password)}[/bold yellow]")
+        password_table.add_row("Comprimento", str(generator.length))
+        password_table.add_row("Caracteres", ", ".join(include_options))
+        password_table.add_row("Entropia", f"{bits:.1f} bits ({entropy_label(bits)})")
+        
+        self.console.print(Panel(
+            password_table,
+            title="[bold]Senha Gerada[/bold]",
+            border_style="green"
+        ))
+        
+        save_option = questionary.confirm(
+            "Deseja salvar a senha em um arquivo?",
+            default=False
+        ).ask()
+        
+        if save_option:
+            filename = unique_path('.', 'senha', '.txt')
+            
+            try:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(f"Senha gerada em: {clock.datetime_str}\n")
+                    f.write(f"Comprimento: {generator.length}\n")
+                    f.write(f"Opcoes: {', '.join(include_options)}\n")
+                    f.write(f"Senha: {password}\n")
+                
+                self.console.print(f"[green]Senha salva em: {filename}[/green]")
+            
+            except Exception as e:
+                self.console.print(f"[red]Erro ao salvar: {e}[/red]")
+    
+    def generate_password_batch(self, generator, bits):
+        count = questionary.text(
+            "Quantidade de senhas:",
+            default="1000",
+            validate=lambda x: x.isdigit() and 1 <= int(x) <= 10000000
+        ).ask()
+        if count is None:
+            return
+        count = int(count)
+        
+        destination = questionary.text(
+            "Arquivo de saida ('-' para a tela):",
+            default=unique_path('.', 'senhas', '.txt')
+        ).ask()
+        if not destination:
+            return
+        
+        started = time.perf_counter()
+        try:
+            if destination.strip() == '-':
+                written = write_passwords(generator, count, self.console.file)
+            else:
+                with open(destination.strip(), 'w', encoding='utf-8') as f:
+                    written = write_passwords(generator, count, f)
+        except OSError as e:
+            self.console.print(f"[red]Erro ao salvar: {e}[/red]")
+            return
+        
+        elapsed = time.perf_counter() - started
+        self.console.print(f"[green]{written} senhas geradas em {elapsed:.2f}s[/green]"
+                           + (f" [dim]-> {destination.strip()}[/dim]" if destination.strip() != '-' else ""))
+        self.console.print(f"[dim]Entropia: {bits:.1f} bits por senha ({entropy_label(bits)}); {generator.discarded} candidatas descartadas por nao cobrir todas as classes[/dim]")
+    
+    def handle_terminal_command(self, command, console=None):
+        console = console or self.console
         parts = command.split()
         cmd = parts[0]
         args = parts[1:] if len(parts) > 1 else []
         
         if cmd == ':history':
-            self.show_command_history()
+            if args:
+                self.show_history_matches(command.split(None, 1)[1], console=console)
+            else:
+                self.show_command_history(console=console)
             return True
         elif cmd == ':info':
-            self.show_unified_info()
+            self.show_unified_info(console=console)
             return True
         elif cmd == ':note':
-            self.add_session_note(' '.join(args) if args else "Nota vazia")
+            self.add_session_note(' '.join(args) if args else "Nota vazia", console=console)
             return True
         elif cmd == ':export':
-            self.export_session_data()
+            self.export_session_data(compress='gz' in args, incremental='novo' in args, console=console)
             return True
         elif cmd == ':reconnect':
-            self.quick_reconnect()
+            self.quick_reconnect(console=console)
+            return True
+        elif cmd == ':save':
+            self.quick_save_log(console=console)
+            return True
+        elif cmd == ':timers':
+            console.print(self.render_timer_status())
+            return True
+        elif cmd == ':rec':
+            self.toggle_command_recording(console=console)
+            return True
+        elif cmd == ':log':
+            if self.recorder:
+                self.stop_recording(console=console)
+            else:
+                self.start_recording(console=console)
+            return True
+        elif cmd == ':search':
+            page = 1
+            if len(args) >= 2 and args[-2] == '-p' and args[-1].isdigit():
+                page = max(int(args[-1]), 1)
+                args = args[:-2]
+            self.search_in_history(' '.join(args), page, console=console)
             return True
         
         return False
     
-    def show_command_history(self):
+    def show_command_history(self, console=None):
+        console = console or self.console
         if not self.command_history:
-            self.console.print(Panel(
+            console.print(Panel(
                 "[yellow]Nenhum comando executado ainda[/yellow]",
                 title="Historico de Comandos",
                 border_style="yellow"
@@ -814,42 +1568,70 @@ class TechUnisenacClient:
                     entry['time']
                 )
             
-            self.console.print(Panel(
+            console.print(Panel(
                 history_table,
                 title="[bold]Historico de Comandos (Ultimos 15)[/bold]",
                 border_style="blue"
             ))
         
-        self.console.print()
+        console.print()
+    
+    def show_history_matches(self, prefix, console=None):
+        console = console or self.console
+        if not self.command_store.wait_loaded(5):
+            self.print_warning("Historico ainda carregando, tente novamente", console=console)
+            return
+        
+        started = time.perf_counter()
+        matches = self.command_store.complete(prefix)
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        if not matches:
+            console.print(f"[yellow]Nenhum comando no historico comeca com '{escape(prefix)}'[/yellow]\n")
+            return
+        
+        history_table = Table(show_header=True, box=box.ROUNDED, border_style="blue")
+        history_table.add_column("#", style="dim", width=4)
+        history_table.add_column("Comando", style="cyan")
+        history_table.add_column("Usos", style="magenta", justify="right")
+        history_table.add_column("Ultimo uso", style="dim")
+        
+        for i, (command, count, last) in enumerate(matches, 1):
+            history_table.add_row(str(i), escape(command), str(count), datetime.fromtimestamp(last).strftime('%d/%m/%Y %H:%M'))
+        
+        console.print(Panel(
+            history_table,
+            title=f"[bold]Historico: '{escape(prefix)}'[/bold]",
+            subtitle=f"[dim]{self.command_store.size} comandos distintos - {elapsed:.2f} ms[/dim]",
+            border_style="blue"
+        ))
+        console.print()
     
-    def quick_save_log(self):
+    def quick_save_log(self, console=None):
+        console = console or self.console
         if not self.message_buffer:
-            self.console.print("[yellow]Nenhuma mensagem para salvar![/yellow]")
+            console.print("[yellow]Nenhuma mensagem para salvar![/yellow]")
             return
         
         try:
-            timestamp = datetime.now().strftime('%H%M%S')
-            filename = f"session_{timestamp}.log"
+            filename = unique_path('.', 'session', '.log')
             
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"SESSAO TERMINAL - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+                f.write(f"SESSAO TERMINAL - {clock.datetime_str}\n")
                 f.write("=" * 40 + "\n")
                 
                 for message in self.message_buffer:
-                    clean_message = message.replace('[dim]', '').replace('[/dim]', '')
-                    clean_message = clean_message.replace('[bold blue]', '').replace('[/bold blue]', '')
-                    clean_message = clean_message.replace('[bold green]', '').replace('[/bold green]', '')
-                    clean_message = clean_message.replace('[cyan]', '').replace('[/cyan]', '')
-                    f.write(clean_message + "\n")
+                    f.write(message_plain(message) + "\n")
             
-            self.console.print(f"[green]Log salvo: {filename}[/green]")
+            console.print(f"[green]Log salvo: {filename}[/green]")
             
         except Exception as e:
-            self.console.print(f"[red]Erro ao salvar: {e}[/red]")
+            console.print(f"[red]Erro ao salvar: {e}[/red]")
         
-        self.console.print()
+        console.print()
     
-    def show_unified_info(self):
+    def show_unified_info(self, console=None):
+        console = console or self.console
         info_table = Table(show_header=False, box=box.ROUNDED, border_style="blue")
         info_table.add_column("Item", style="bold cyan", width=20)
         info_table.add_column("Valor", style="white")
@@ -875,12 +1657,37 @@ class TechUnisenacClient:
         info_table.add_row("Bytes Enviados", f"{self.session_stats['bytes_sent']} bytes")
         info_table.add_row("Bytes Recebidos", f"{self.session_stats['bytes_received']} bytes")
         
-        self.console.print(Panel(
+        console.print(Panel(
             info_table,
             title="[bold]Info da Conexao & Estatisticas[/bold]",
             border_style="blue"
         ))
-        self.console.print()
+        
+        if self.latency.histograms:
+            latency_table = Table(show_header=True, box=box.ROUNDED, border_style="magenta")
+            latency_table.add_column("Comando", style="bold cyan")
+            latency_table.add_column("N", justify="right")
+            latency_table.add_column("p50", justify="right")
+            latency_table.add_column("p95", justify="right")
+            latency_table.add_column("p99", justify="right")
+            latency_table.add_column("Recentes", style="magenta")
+            
+            for name, histogram in self.latency.items():
+                latency_table.add_row(
+                    "[bold]todos[/bold]" if name == '*' else escape(name),
+                    str(histogram.total),
+                    f"{histogram.percentile(50):.2f}ms",
+                    f"{histogram.percentile(95):.2f}ms",
+                    f"{histogram.percentile(99):.2f}ms",
+                    sparkline(list(histogram.recent))
+                )
+            
+            console.print(Panel(
+                latency_table,
+                title="[bold]Latencia por Comando (ida e volta)[/bold]",
+                border_style="magenta"
+            ))
+        console.print()
 
     def show_connection_info(self):
         if self.connected:
@@ -903,7 +1710,7 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
         self.console.print()
     
     def echo_message(self, message):
-        timestamp = datetime.now().strftime('%H:%M:%S')
+        timestamp = clock.time_str
         echo_msg = f"[dim]{timestamp}[/dim] [bold magenta]ECHO[/bold magenta] {message}"
         
         self.console.print(Panel(
@@ -924,7 +1731,7 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
 
 [cyan]Conectado ha:[/cyan] [bold yellow]{hours:02d}h {minutes:02d}m {seconds:02d}s[/bold yellow]
 [cyan]Inicio:[/cyan] {datetime.fromtimestamp(self.connection_time).strftime('%H:%M:%S')}
-[cyan]Agora:[/cyan] {datetime.now().strftime('%H:%M:%S')}
+[cyan]Agora:[/cyan] {clock.time_str}
 
 [dim]Media de comandos/minuto:[/dim] {len(self.command_history) / max(uptime/60, 1):.1f}"""
         else:
@@ -937,12 +1744,13 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
         ))
         self.console.print()
     
-    def add_session_note(self, note):
+    def add_session_note(self, note, console=None):
+        console = console or self.console
         if not note.strip():
-            self.console.print("[yellow]Anotacao vazia ignorada[/yellow]")
+            console.print("[yellow]Anotacao vazia ignorada[/yellow]")
             return
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
+        timestamp = clock.time_str
         note_entry = {
             'time': timestamp,
             'note': note.strip(),
@@ -950,129 +1758,344 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
         }
         
         self.session_notes.append(note_entry)
+        self.search_index.add('Nota', len(self.session_notes) - 1, note_entry['note'])
         
-        self.console.print(Panel(
+        console.print(Panel(
             f"[bold blue]NOTA ADICIONADA[/bold blue]\n[yellow]{note.strip()}[/yellow]",
             title=f"[dim]{timestamp}[/dim]",
             border_style="blue"
         ))
-        self.console.print()
+        console.print()
     
-    def search_in_history(self, search_term):
+    def describe_search_result(self, kind, ref, text):
+        if kind == 'Mensagem':
+            message = self.message_buffer.get(ref)
+            return message_plain(message) if message else text
+        elif kind == 'Comando':
+            return f"{self.command_history[ref]['time']} - {text}"
+        return f"{self.session_notes[ref]['time']} - {text}"
+    
+    def search_in_history(self, search_term, page=1, console=None):
+        console = console or self.console
         if not search_term:
-            self.console.print("[yellow]Digite um termo para buscar[/yellow]")
+            console.print("[yellow]Digite um termo para buscar[/yellow]")
             return
         
-        results = []
-        search_lower = search_term.lower()
-        
-        for i, message in enumerate(self.message_buffer):
-            if search_lower in message.lower():
-                results.append(('Mensagem', i+1, message))
-        
-        for i, cmd in enumerate(self.command_history):
-            if search_lower in cmd['command'].lower():
-                results.append(('Comando', i+1, f"{cmd['time']} - {cmd['command']}"))
-        
-        for i, note in enumerate(self.session_notes):
-            if search_lower in note['note'].lower():
-                results.append(('Nota', i+1, f"{note['time']} - {note['note']}"))
+        try:
+            total, results = self.search_index.search(search_term, page=page, page_size=10)
+        except re.error as e:
+            console.print(f"[red]Expressao regular invalida: {escape(str(e))}[/red]")
+            return
         
-        if not results:
-            self.console.print(f"[yellow]Nenhum resultado encontrado para: '{search_term}'[/yellow]")
+        if not total:
+            console.print(f"[yellow]Nenhum resultado encontrado para: '{escape(search_term)}'[/yellow]")
+        elif not results:
+            console.print(f"[yellow]Pagina {page} vazia ({total} resultados)[/yellow]")
         else:
             search_table = Table(show_header=True, box=box.ROUNDED, border_style="blue")
             search_table.add_column("Tipo", style="cyan", width=10)
-            search_table.add_column("#", style="dim", width=4)
+            search_table.add_column("#", style="dim", width=6)
             search_table.add_column("Conteudo", style="white")
             
-            for result_type, index, content in results[:10]:
-                clean_content = content.replace('[dim]', '').replace('[/dim]', '')
-                clean_content = clean_content.replace('[bold blue]', '').replace('[/bold blue]', '')
-                clean_content = clean_content.replace('[bold green]', '').replace('[/bold green]', '')
-                clean_content = clean_content.replace('[cyan]', '').replace('[/cyan]', '')
-                
-                search_table.add_row(result_type, str(index), clean_content[:60] + "..." if len(clean_content) > 60 else clean_content)
+            for kind, ref, text in results:
+                content = self.describe_search_result(kind, ref, text)
+                search_table.add_row(kind, str(ref + 1), escape(content[:60] + "..." if len(content) > 60 else content))
             
-            self.console.print(Panel(
+            pages = (total + 9) // 10
+            console.print(Panel(
                 search_table,
-                title=f"[bold]Resultados para '{search_term}' ({len(results)})[/bold]",
+                title=f"[bold]Resultados para '{escape(search_term)}' ({total}) - pagina {page}/{pages}[/bold]",
                 border_style="blue"
             ))
         
-        self.console.print()
+        console.print()
+    
+    def iter_export_records(self, marks, ends):
+        yield {
+            'type': 'session',
+            'host': self.host,
+            'port': self.port,
+            'connected': self.connected,
+            'start_time': datetime.fromtimestamp(self.connection_time).isoformat() if self.connection_time else None,
+            'export_time': datetime.now().isoformat(),
+            'incremental': any(marks.values())
+        }
+        yield {'type': 'statistics', **self.session_stats}
+        yield {'type': 'latency', 'commands': self.latency.summary()}
+        
+        for seq, message in self.message_buffer.since(marks['messages']):
+            if seq >= ends['messages']:
+                break
+            yield {'type': 'message', 'seq': seq, 'time': message.time, 'direction': message.direction, 'text': message.text}
+        
+        sources = (('commands', 'command', self.command_history), ('notes', 'note', self.session_notes),
+                   ('connections', 'connection', self.connection_history))
+        for name, record_type, entries in sources:
+            for index in range(min(marks[name], ends[name]), ends[name]):
+                yield {'type': record_type, 'index': index, **entries[index]}
     
-    def export_session_data(self):
+    def export_session_data(self, compress=False, incremental=False, console=None):
+        console = console or self.console
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"session_export_{timestamp}.json"
-            
-            export_data = {
-                'session_info': {
-                    'host': self.host,
-                    'port': self.port,
-                    'connected': self.connected,
-                    'start_time': datetime.fromtimestamp(self.connection_time).isoformat() if self.connection_time else None,
-                    'export_time': datetime.now().isoformat()
-                },
-                'statistics': self.session_stats,
-                'messages': [msg.replace('[dim]', '').replace('[/dim]', '').replace('[bold blue]', '').replace('[/bold blue]', '').replace('[bold green]', '').replace('[/bold green]', '').replace('[cyan]', '').replace('[/cyan]', '') for msg in self.message_buffer],
-                'command_history': self.command_history,
-                'notes': self.session_notes,
-                'connection_history': self.connection_history[-5:]
+            suffix = '.ndjson.gz' if compress else '.ndjson'
+            filename = unique_path('.', 'session_export', suffix)
+            
+            marks = self.export_marks if incremental else dict.fromkeys(self.export_marks, 0)
+            # Limites fixados no início: o que chegar durante a exportação fica para a próxima
+            ends = {
+                'messages': self.message_buffer.next,
+                'commands': len(self.command_history),
+                'notes': len(self.session_notes),
+                'connections': len(self.connection_history)
             }
             
-            import json
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            count = write_ndjson(filename, self.iter_export_records(marks, ends), compress)
+            self.export_marks = ends
             
-            self.console.print(f"[green]Dados exportados para: {filename}[/green]")
-            self.console.print(f"[dim]Incluidos: {len(self.message_buffer)} mensagens, {len(self.command_history)} comandos, {len(self.session_notes)} notas[/dim]")
+            console.print(f"[green]Dados exportados para: {filename}[/green]")
+            console.print(f"[dim]{count} registros{' desde a ultima exportacao' if incremental else ''}[/dim]")
             
         except Exception as e:
-            self.console.print(f"[red]Erro ao exportar: {e}[/red]")
+            console.print(f"[red]Erro ao exportar: {e}[/red]")
         
-        self.console.print()
+        console.print()
     
-    def quick_reconnect(self):
+    def quick_reconnect(self, console=None):
+        console = console or self.console
         if self.connected:
-            self.console.print("[yellow]Ja conectado! Use :info para ver status[/yellow]")
+            console.print("[yellow]Ja conectado! Use :info para ver status[/yellow]")
             return
         
-        self.console.print("[cyan]Tentando reconectar...[/cyan]")
+        if self.link_state == 'reconectando':
+            console.print("[cyan]Reconexao automatica em andamento; tentando agora...[/cyan]")
+            self.reconnect_wake.set()
+            return
+        
+        console.print("[cyan]Tentando reconectar...[/cyan]")
         
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5)
-            self.socket.connect((self.host, self.port))
+            self.connection.connect(self.host, self.port, timeout=5)
             
             self.connected = True
             self.connection_time = time.time()
+            self.closing = False
+            self.link_state = 'conectado'
+            self.reconnect_backoff.reset()
             
-            receive_thread = threading.Thread(target=self.receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
+            self.start_receiving()
             
-            self.console.print("[green]Reconectado com sucesso![/green]")
+            console.print("[green]Reconectado com sucesso![/green]")
             
             self.connection_history.append({
                 'host': self.host,
                 'port': self.port,
-                'time': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'time': clock.datetime_str,
                 'status': 'Reconexao bem-sucedida'
             })
             
         except Exception as e:
-            self.console.print(f"[red]Falha na reconexao: {e}[/red]")
+            console.print(f"[red]Falha na reconexao: {e}[/red]")
             
             self.connection_history.append({
                 'host': self.host,
                 'port': self.port,
-                'time': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+                'time': clock.datetime_str,
                 'status': f'Falha reconexao: {str(e)[:20]}...'
             })
         
+        console.print()
+    
+    def render_dashboard_header(self, monitor):
+        status = monitor.parsed['status'] or {}
+        uptime = monitor.parsed['uptime'] or status.get('uptime', '-')
+        poll = f"{monitor.poll_ms:.1f}ms" if monitor.poll_ms is not None else "-"
+        return Panel(
+            f"[bold cyan]{self.host}:{self.port}[/bold cyan]  Uptime: [green]{uptime}[/green]  "
+            f"Leitura: [yellow]{poll}[/yellow]  Atualizacoes: {monitor.polls}",
+            title="[bold]Painel do Servidor[/bold]",
+            subtitle="[dim]Enter para voltar[/dim]",
+            border_style="cyan"
+        )
+    
+    def render_dashboard_stats(self, monitor):
+        status = monitor.parsed['status'] or {}
+        stats_table = Table(show_header=False, box=box.ROUNDED, border_style="blue")
+        stats_table.add_column("Item", style="bold cyan")
+        stats_table.add_column("Valor", justify="right")
+        stats_table.add_column("Tendencia", style="green")
+        
+        rate = monitor.rates[-1] if monitor.rates else None
+        stats_table.add_row("Sessoes", str(monitor.sessions[-1]) if monitor.sessions else "-", sparkline(list(monitor.sessions), 0))
+        stats_table.add_row("Comandos/s", f"{rate:.1f}" if rate is not None else "-", sparkline(list(monitor.rates), 0))
+        stats_table.add_row("Conexoes Totais", str(status.get('total_connections', '-')), "")
+        stats_table.add_row("Comandos Executados", str(status.get('commands_executed', '-')), "")
+        if 'nodes' in status:
+            stats_table.add_row("Nos no Cluster", str(status['nodes']), "")
+        return Panel(stats_table, title="[bold]Servidor[/bold]", border_style="blue")
+    
+    def render_dashboard_users(self, monitor):
+        users_table = Table(show_header=True, box=box.ROUNDED, border_style="green", expand=True)
+        users_table.add_column("Usuario", style="bold cyan")
+        users_table.add_column("IP")
+        users_table.add_column("Conectado", justify="right")
+        users_table.add_column("Cmds", justify="right", style="yellow")
+        users_table.add_column("Atividade", style="green")
+        
+        users = monitor.visible_users()
+        for user in users:
+            name = user['username'] if not user['node'] else f"{user['username']} ({user['node']})"
+            trend = monitor.user_trends.get(user['username'], ())
+            users_table.add_row(name, user['ip'], user['duration'], str(user['commands']), sparkline(list(trend), 0))
+        if not users:
+            users_table.add_row("[dim]nenhum usuario[/dim]", "", "", "", "")
+        return Panel(users_table, title=f"[bold]Usuarios ({len(users)})[/bold]", border_style="green")
+    
+    def update_dashboard(self, layout, monitor, cache):
+        # Cada região só é reconstruída quando os dados de que depende mudam
+        sections = {
+            'header': (monitor.versions['uptime'], monitor.polls, self.render_dashboard_header),
+            'stats': (monitor.versions['status'], tuple(monitor.sessions), tuple(monitor.rates), self.render_dashboard_stats),
+            'users': (monitor.versions['users'], tuple(tuple(trend) for trend in monitor.user_trends.values()), self.render_dashboard_users)
+        }
+        changed = False
+        for name, key in sections.items():
+            if cache.get(name) != key:
+                layout[name].update(key[-1](monitor))
+                cache[name] = key
+                changed = True
+        return changed
+    
+    def show_dashboard(self):
+        try:
+            interval = questionary.text(
+                "Intervalo de atualizacao (s):",
+                default="1",
+                validate=lambda x: x.replace('.', '', 1).isdigit() and float(x) > 0
+            ).ask()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if interval is None:
+            return
+        interval = float(interval)
+        
+        monitor = ServerMonitor(self.host, self.port)
+        layout = Layout()
+        layout.split_column(Layout(name="header", size=3), Layout(name="body"))
+        layout["body"].split_row(Layout(name="stats", ratio=2), Layout(name="users", ratio=3))
+        cache = {}
+        line_input = LineInput()
+        
+        async def run_dashboard(live):
+            try:
+                await monitor.connect()
+                while True:
+                    await monitor.poll()
+                    if self.update_dashboard(layout, monitor, cache):
+                        live.refresh()
+                    
+                    deadline = time.monotonic() + interval
+                    while time.monotonic() < deadline:
+                        if not line_input.lines.empty():
+                            return
+                        await asyncio.sleep(0.05)
+            finally:
+                await monitor.close()
+        
+        try:
+            with Live(layout, console=self.console, auto_refresh=False) as live:
+                line_input.start()
+                asyncio.run(run_dashboard(live))
+        except (OSError, ConnectionError, asyncio.TimeoutError) as e:
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            self.print_error(f"Falha no painel: {reason}")
+            questionary.press_any_key_to_continue("Pressione qualquer tecla para continuar...").ask()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            line_input.stop()
+    
+    def render_fanout_results(self, results, side_by_side):
+        if side_by_side:
+            panels = []
+            for name, response, elapsed, error in results:
+                body = f"[red]{escape(error)}[/red]" if error else escape(response) or "[dim](vazio)[/dim]"
+                panels.append(Panel(
+                    body,
+                    title=f"[bold]{name}[/bold]",
+                    subtitle=f"[yellow]{elapsed:.1f}ms[/yellow]",
+                    border_style="red" if error else "green"
+                ))
+            return Columns(panels, equal=True, expand=True)
+        
+        merged_table = Table(show_header=True, box=box.ROUNDED, border_style="blue")
+        merged_table.add_column("Servidor", style="bold cyan")
+        merged_table.add_column("Latencia", justify="right", style="yellow")
+        merged_table.add_column("Resposta", style="white")
+        for name, response, elapsed, error in sorted(results, key=lambda result: result[2]):
+            merged_table.add_row(name, f"{elapsed:.1f}ms", f"[red]{escape(error)}[/red]" if error else escape(response))
+        return merged_table
+    
+    def show_fanout(self):
+        self.console.print(Panel("[bold cyan]Multi-Servidor[/bold cyan]", border_style="cyan"))
         self.console.print()
+        
+        targets_text = questionary.text(
+            "Servidores (host:porta separados por virgula):",
+            default=f"{self.host}:{self.port}"
+        ).ask()
+        if not targets_text:
+            return
+        
+        try:
+            targets = [parse_target(item, self.port) for item in targets_text.split(',') if item.strip()]
+        except ValueError:
+            self.print_error("Porta invalida na lista de servidores")
+            return
+        
+        loop = asyncio.new_event_loop()
+        session = FanOutSession(targets)
+        try:
+            errors = loop.run_until_complete(session.connect())
+            for name, error in errors.items():
+                self.print_error(f"{name}: {error}")
+            if not session.clients:
+                self.print_error("Nenhum servidor conectado")
+                return
+            
+            self.print_success(f"{len(session.clients)} sessoes abertas. Use :modo para alternar a exibicao e :quit para sair.")
+            side_by_side = True
+            
+            while session.clients:
+                command = questionary.text("> Comando (todos):", qmark="").ask()
+                if command is None or command.strip() == ':quit':
+                    break
+                
+                command = command.strip()
+                if not command:
+                    continue
+                if command == ':modo':
+                    side_by_side = not side_by_side
+                    self.print_success("Exibicao lado a lado" if side_by_side else "Exibicao combinada")
+                    continue
+                
+                started = time.perf_counter()
+                results = loop.run_until_complete(session.execute(command))
+                elapsed = (time.perf_counter() - started) * 1000
+                
+                self.console.print(Panel(
+                    self.render_fanout_results(results, side_by_side),
+                    title=f"[bold]{escape(command)}[/bold] - {len(results)} servidores em {elapsed:.1f}ms",
+                    border_style="blue"
+                ))
+                
+                if command.lower() in QUIT_COMMANDS:
+                    break
+        
+        except (EOFError, KeyboardInterrupt):
+            pass
+        finally:
+            loop.run_until_complete(session.close())
+            loop.close()
     
     def print_final_message(self):
         final_panel = Panel(
@@ -1142,6 +2165,12 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
                 
                 elif choice == 'password':
                     self.generate_password()
+                
+                elif choice == 'dashboard':
+                    self.show_dashboard()
+                
+                elif choice == 'fanout':
+                    self.show_fanout()
         except Exception as e:
             self.print_error(f"Erro inesperado: {e}")
                     
@@ -1150,15 +2179,56 @@ Comandos: [magenta]{len(self.command_history)}[/magenta]"""
             self.print_warning("Saindo...")
             if self.connected:
                 self.disconnect_from_server()
+        
+        finally:
+            self.stop_recording()
+            self.command_store.close()
+            if self.command_recording:
+                self.command_recording.close()
 
 def main():
     try:
-        client = TechUnisenacClient()
+        args, options = parse_options(sys.argv[1:])
+        
+        try:
+            max_messages = int(options.get('scrollback-lines', 100000))
+            max_message_bytes = int(options.get('scrollback-mb', 64)) * 1024 * 1024
+        except ValueError:
+            print("❌ Erro: Limites do scrollback devem ser números")
+            return
+        if max_messages <= 0 or max_message_bytes <= 0:
+            print("❌ Erro: Limites do scrollback devem ser maiores que zero")
+            return
+        
+        client = TechUnisenacClient(max_messages, max_message_bytes)
+        
+        try:
+            client.max_reconnect_attempts = int(options.get('reconnect-attempts', 10))
+        except ValueError:
+            print("❌ Erro: --reconnect-attempts deve ser um número")
+            return
+        
+        try:
+            client.recorder_options = {
+                'directory': options.get('log-dir') or 'logs',
+                'max_bytes': int(options.get('log-max-mb', 10)) * 1024 * 1024,
+                'max_seconds': int(options.get('log-rotate-min', 60)) * 60,
+                'compress': options.get('log-gzip', '0') not in ('0', 'nao', 'no')
+            }
+        except ValueError:
+            print("❌ Erro: Limites do log devem ser números")
+            return
+        
+        if 'log-dir' in options:
+            client.start_recording()
+        
+        if 'history-file' in options:
+            client.command_store = CommandHistory(options['history-file'])
         
-        if len(sys.argv) >= 3:
+        if len(args) >= 2:
             try:
-                client.host = sys.argv[1]
-                client.port = int(sys.argv[2])
+                client.host = args[0]
+                client.port = int(args[1])
             except ValueError:
                 print("❌ Erro: Porta deve ser um número")
                 return
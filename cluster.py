@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import socket
+import threading
+import time
+import itertools
+
+MAX_SESSIONS_PER_DATAGRAM = 200
+
+def parse_address(text, default_host='127.0.0.1'):
+    host, _, port = text.strip().rpartition(':')
+    return (host or default_host, int(port))
+
+class ClusterNode:
+    def __init__(self, node_id, bind_address, peers, sessions_fn, stats_fn,
+                 interval=1.0, full_every=10, expire_after=5.0):
+        self.node_id = node_id
+        self.bind_address = bind_address
+        self.peers = [peer for peer in peers if peer != bind_address]
+        self.sessions_fn = sessions_fn
+        self.stats_fn = stats_fn
+        self.interval = interval
+        self.full_every = full_every
+        self.expire_after = expire_after
+
+        self.view = {}
+        self._staging = {}
+        self._published = {}
+        self._seq = itertools.count(1)
+        # Muda a cada execução: separa um nó reiniciado (seq recomeça em 1) de
+        # datagramas atrasados do mesmo processo
+        self.incarnation = time.time_ns()
+        self._running = False
+        self.sock = None
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(self.bind_address)
+        self._running = True
+
+        for target, name in ((self._publish_loop, "cluster-pub"), (self._receive_loop, "cluster-recv")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self.sock:
+            self.sock.close()
+
+    def _send(self, message):
+        data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        for peer in self.peers:
+            try:
+                self.sock.sendto(data, peer)
+            except OSError:
+                pass
+
+    def _publish_loop(self):
+        for tick in itertools.count():
+            if not self._running:
+                break
+            try:
+                self.publish(full=(tick % self.full_every == 0))
+            except Exception:
+                pass
+            time.sleep(self.interval)
+
+    def publish(self, full=False):
+        sessions = self.sessions_fn()
+        stats = self.stats_fn()
+
+        if full:
+            items = list(sessions.items())
+            snapshot = next(self._seq)
+            chunks = [items[i:i + MAX_SESSIONS_PER_DATAGRAM] for i in range(0, len(items), MAX_SESSIONS_PER_DATAGRAM)] or [[]]
+            for part, chunk in enumerate(chunks):
+                self._send({
+                    'node': self.node_id, 'incarnation': self.incarnation, 'type': 'full', 'snapshot': snapshot,
+                    'part': part, 'parts': len(chunks),
+                    'sessions': dict(chunk), 'stats': stats
+                })
+        else:
+            changed = [(key, info) for key, info in sessions.items() if self._published.get(key) != info]
+            removed = [key for key in self._published if key not in sessions]
+            # Mesmo sem mudanças o delta serve como heartbeat e leva os contadores
+            for start in range(0, max(len(changed), 1), MAX_SESSIONS_PER_DATAGRAM):
+                self._send({
+                    'node': self.node_id, 'incarnation': self.incarnation, 'type': 'delta', 'seq': next(self._seq),
+                    'sessions': dict(changed[start:start + MAX_SESSIONS_PER_DATAGRAM]),
+                    'removed': removed if start == 0 else [],
+                    'stats': stats
+                })
+
+        self._published = sessions
+
+    def _receive_loop(self):
+        while self._running:
+            try:
+                data, _ = self.sock.recvfrom(65535)
+                self.merge(json.loads(data.decode('utf-8')))
+            except OSError:
+                if not self._running:
+                    break
+            except (ValueError, KeyError):
+                continue
+
+    def merge(self, message):
+        node = message['node']
+        if node == self.node_id:
+            return
+
+        incarnation = message['incarnation']
+        entry = self.view.get(node)
+        if entry is not None and incarnation < entry['incarnation']:
+            # Datagrama de uma execução anterior do nó
+            return
+        if entry is None or incarnation > entry['incarnation']:
+            # Nó novo ou reiniciado: a sequência recomeça do zero
+            self._staging.pop(node, None)
+            entry = {'sessions': {}, 'stats': {}, 'last_seen': 0, 'seq': None, 'incarnation': incarnation}
+        # Cópia: leitores continuam com a entrada anterior até a troca no fim
+        entry = dict(entry, last_seen=time.monotonic())
+        seq = message['snapshot'] if message['type'] == 'full' else message['seq']
+
+        if entry['seq'] is not None and seq <= entry['seq']:
+            # Snapshot ou delta atrasado: aplicá-lo traria de volta sessões já encerradas
+            pass
+        elif message['type'] == 'full':
+            staging = self._staging.get(node)
+            if staging is None or staging['snapshot'] != seq:
+                staging = {'snapshot': seq, 'parts': set(), 'sessions': {}}
+                self._staging[node] = staging
+            staging['parts'].add(message['part'])
+            staging['sessions'].update(message['sessions'])
+            if len(staging['parts']) == message['parts']:
+                del self._staging[node]
+                entry.update(sessions=staging['sessions'], seq=seq)
+            entry['stats'] = message['stats']
+        else:
+            sessions = dict(entry['sessions'])
+            sessions.update(message['sessions'])
+            for key in message['removed']:
+                sessions.pop(key, None)
+            entry.update(sessions=sessions, seq=seq, stats=message['stats'])
+
+        # Troca a referência inteira: leitores sempre veem uma entrada consistente
+        self.view[node] = entry
+
+    def live_nodes(self):
+        now = time.monotonic()
+        return {node: entry for node, entry in list(self.view.items()) if now - entry['last_seen'] <= self.expire_after}
+
+    def cluster_sessions(self):
+        sessions = [(self.node_id, info) for info in self.sessions_fn().values()]
+        for node, entry in sorted(self.live_nodes().items()):
+            sessions.extend((node, info) for info in entry['sessions'].values())
+        return sessions
+
+    def cluster_stats(self):
+        nodes = self.live_nodes()
+        totals = dict(self.stats_fn())
+        for entry in nodes.values():
+            for name, value in entry['stats'].items():
+                if name != 'uptime':
+                    totals[name] = totals.get(name, 0) + value
+        totals['nodes'] = len(nodes) + 1
+        return totals
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+def parse_options(argv, flags=()):
+    # "--nome valor", "--nome=valor" ou só "--nome" (sem valor: fim da linha,
+    # outra opção a seguir ou nome listado em flags) -> options[nome] = ""
+    positional = []
+    options = {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if not arg.startswith('--') or arg == '--':
+            positional.append(arg)
+            i += 1
+            continue
+
+        name, sep, value = arg[2:].partition('=')
+        if sep:
+            options[name] = value
+            i += 1
+        elif name in flags or i + 1 >= len(argv) or argv[i + 1].startswith('--'):
+            options[name] = ""
+            i += 1
+        else:
+            options[name] = argv[i + 1]
+            i += 2
+    return positional, options
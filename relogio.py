@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+class CachedClock:
+    def __init__(self):
+        self._snapshot = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        now = datetime.now()
+        date_str = now.strftime('%d/%m/%Y')
+        time_str = now.strftime('%H:%M:%S')
+        # Uma única atribuição para que leitores nunca vejam campos de segundos diferentes
+        self._snapshot = (time.monotonic(), now, date_str, time_str, f"{date_str} {time_str}")
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="relogio")
+                self._thread.daemon = True
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(1 - (time.time() % 1))
+            self.refresh()
+
+    @property
+    def tick(self):
+        return self._snapshot[0]
+
+    @property
+    def now(self):
+        return self._snapshot[1]
+
+    @property
+    def date_str(self):
+        return self._snapshot[2]
+
+    @property
+    def time_str(self):
+        return self._snapshot[3]
+
+    @property
+    def datetime_str(self):
+        return self._snapshot[4]
+
+@lru_cache(maxsize=4096)
+def format_seconds(total_seconds):
+    days, remainder = divmod(total_seconds, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
+
+    parts = []
+    if days > 0:
+        parts.append(f"{days}d")
+    if hours > 0:
+        parts.append(f"{hours}h")
+    if minutes > 0:
+        parts.append(f"{minutes}m")
+    if seconds > 0 or not parts:
+        parts.append(f"{seconds}s")
+
+    return " ".join(parts)
+
+clock = CachedClock().start()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import math
+import os
+import string
+import sys
+import time
+from itertools import combinations
+
+CHARSETS = {
+    'lower': string.ascii_lowercase,
+    'upper': string.ascii_uppercase,
+    'digits': string.digits,
+    'symbols': "!@#$%^&*()_+-=[]{}|;:,.<>?"
+}
+
+class PasswordGenerator:
+    def __init__(self, length=12, classes=('lower', 'upper', 'digits'), require_all=True, chunk_size=65536):
+        if not classes:
+            raise ValueError("Nenhuma classe de caracteres selecionada")
+        unknown = [name for name in classes if name not in CHARSETS]
+        if unknown:
+            raise ValueError(f"Classe desconhecida: {', '.join(unknown)}")
+        if require_all and length < len(classes):
+            raise ValueError("Comprimento menor que o numero de classes exigidas")
+
+        self.length = length
+        self.classes = list(classes)
+        self.require_all = require_all
+        self.chunk_size = chunk_size
+        self.alphabet = "".join(CHARSETS[name] for name in self.classes)
+        self._class_sets = [frozenset(CHARSETS[name]) for name in self.classes]
+
+        # Bytes acima do maior múltiplo do alfabeto são descartados: sem viés de módulo
+        size = len(self.alphabet)
+        self.limit = 256 - (256 % size)
+        self._table = bytes(ord(self.alphabet[value % size]) for value in range(256))
+        self._rejected = bytes(range(self.limit, 256))
+        self._pool = b""
+        self._offset = 0
+        self.generated = 0
+        self.discarded = 0
+
+    def _take(self, count):
+        if len(self._pool) - self._offset < count:
+            pool = self._pool[self._offset:]
+            while len(pool) < count:
+                # translate descarta e mapeia o lote inteiro em C, sem laço em Python
+                pool += os.urandom(self.chunk_size).translate(self._table, self._rejected)
+            self._pool, self._offset = pool, 0
+        data = self._pool[self._offset:self._offset + count]
+        self._offset += count
+        return data.decode('ascii')
+
+    def _has_all_classes(self, password):
+        chars = set(password)
+        return all(chars & class_set for class_set in self._class_sets)
+
+    def generate(self):
+        while True:
+            password = self._take(self.length)
+            # Rejeitar a senha inteira mantém a distribuição uniforme entre as válidas
+            if not self.require_all or self._has_all_classes(password):
+                self.generated += 1
+                return password
+            self.discarded += 1
+
+    def generate_many(self, count):
+        for _ in range(count):
+            yield self.generate()
+
+    def entropy_bits(self):
+        size = len(self.alphabet)
+        if not self.require_all:
+            return self.length * math.log2(size)
+
+        # Inclusão-exclusão: senhas do alfabeto que não deixam nenhuma classe de fora
+        class_sizes = [len(CHARSETS[name]) for name in self.classes]
+        valid = 0
+        for missing in range(len(class_sizes) + 1):
+            for subset in combinations(class_sizes, missing):
+                valid += (-1) ** missing * (size - sum(subset)) ** self.length
+        return math.log2(valid)
+
+def entropy_label(bits):
+    if bits < 40:
+        return "fraca"
+    if bits < 60:
+        return "razoavel"
+    if bits < 80:
+        return "forte"
+    return "muito forte"
+
+def write_passwords(generator, count, stream, batch=1000):
+    written = 0
+    while written < count:
+        size = min(batch, count - written)
+        stream.write("\n".join(generator.generate_many(size)) + "\n")
+        written += size
+    stream.flush()
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera senhas em lote com os.urandom")
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--length', type=int, default=16)
+    parser.add_argument('--classes', default="lower,upper,digits,symbols", help="Lista de: " + ",".join(CHARSETS))
+    parser.add_argument('--no-require', action='store_true', help="Nao exigir ao menos um caractere de cada classe")
+    parser.add_argument('--output', default='-', help="Arquivo de saida ('-' para stdout)")
+    args = parser.parse_args()
+
+    try:
+        generator = PasswordGenerator(args.length, [name.strip() for name in args.classes.split(',') if name.strip()], not args.no_require)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    if args.output == '-':
+        written = write_passwords(generator, args.count, sys.stdout)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            written = write_passwords(generator, args.count, f)
+
+    bits = generator.entropy_bits()
+    print(f"{written} senhas em {time.perf_counter() - started:.2f}s - {bits:.1f} bits de entropia cada ({entropy_label(bits)})", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import platform
+import shutil
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+@lru_cache(maxsize=1)
+def platform_facts():
+    # Dados que não mudam durante a execução: consultados uma única vez
+    processor = platform.processor() or platform.machine()
+    facts = {
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': processor,
+        'python': platform.python_version(),
+        'hostname': platform.node(),
+        'cpu_count': os.cpu_count() or 1,
+        'mem_total': None
+    }
+    if psutil:
+        facts['mem_total'] = psutil.virtual_memory().total
+    else:
+        meminfo = _read_meminfo()
+        if 'MemTotal' in meminfo:
+            facts['mem_total'] = meminfo['MemTotal'] * 1024
+    return facts
+
+def _read_meminfo():
+    values = {}
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                values[name] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+def _read_cpu_times():
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    # idle + iowait contam como ocioso
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return sum(fields), idle
+
+def _read_net_bytes():
+    sent = received = 0
+    try:
+        with open('/proc/net/dev') as f:
+            for line in f.readlines()[2:]:
+                name, _, counters = line.partition(':')
+                if name.strip() == 'lo':
+                    continue
+                counters = counters.split()
+                received += int(counters[0])
+                sent += int(counters[8])
+    except (OSError, ValueError, IndexError):
+        return None
+    return sent, received
+
+class SystemSampler:
+    def __init__(self, interval=1.0, history=60, disk_path=None):
+        self.interval = interval
+        self.disk_path = disk_path or os.path.abspath(os.sep)
+        self.samples = deque(maxlen=history)
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_cpu = None
+        self._last_net = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                # Primeira leitura já na chamada: memória e disco aparecem de imediato
+                self.sample()
+                self._thread = threading.Thread(target=self._run, name="amostrador")
+                self._thread.daemon = True
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                pass
+
+    def _cpu_percent(self):
+        if psutil:
+            # interval=None compara com a chamada anterior, sem bloquear
+            value = psutil.cpu_percent(interval=None)
+            first = self._last_cpu is None
+            self._last_cpu = True
+            return None if first else value
+
+        times = _read_cpu_times()
+        if times is None:
+            return None
+        previous, self._last_cpu = self._last_cpu, times
+        if previous is None or times[0] == previous[0]:
+            return None
+        busy = (times[0] - previous[0]) - (times[1] - previous[1])
+        return 100.0 * busy / (times[0] - previous[0])
+
+    def _memory_percent(self):
+        if psutil:
+            return psutil.virtual_memory().percent
+        meminfo = _read_meminfo()
+        if 'MemTotal' not in meminfo or 'MemAvailable' not in meminfo:
+            return None
+        return 100.0 * (meminfo['MemTotal'] - meminfo['MemAvailable']) / meminfo['MemTotal']
+
+    def _net_rates(self, now):
+        if psutil:
+            counters = psutil.net_io_counters()
+            current = (counters.bytes_sent, counters.bytes_recv) if counters else None
+        else:
+            current = _read_net_bytes()
+        if current is None:
+            return None, None
+
+        previous, self._last_net = self._last_net, (now, current)
+        if previous is None or now <= previous[0]:
+            return None, None
+        elapsed = now - previous[0]
+        return (current[0] - previous[1][0]) / elapsed, (current[1] - previous[1][1]) / elapsed
+
+    def sample(self):
+        now = time.monotonic()
+        try:
+            disk = shutil.disk_usage(self.disk_path)
+            disk_percent = 100.0 * disk.used / disk.total
+        except OSError:
+            disk_percent = None
+        sent_rate, received_rate = self._net_rates(now)
+
+        self.samples.append({
+            'time': now,
+            'cpu': self._cpu_percent(),
+            'memory': self._memory_percent(),
+            'disk': disk_percent,
+            'net_sent': sent_rate,
+            'net_received': received_rate,
+            'load': os.getloadavg()[0] if hasattr(os, 'getloadavg') else None
+        })
+
+    def latest(self):
+        return self.samples[-1] if self.samples else {}
+
+    def history(self, key):
+        return [sample[key] for sample in list(self.samples) if sample.get(key) is not None]
+
+def format_rate(value):
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB/s"
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import contextlib
+import csv
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+
+import tech_unisenac
+
+PROMPT = b"Digite um comando: "
+
+# Crescimento tolerado entre a primeira e a segunda metade da execução
+TOLERANCES = {
+    'rss_kb': (0.10, 4096),
+    'traced_kb': (0.10, 1024),
+    'fds': (0, 8),
+    'threads': (0, 8),
+    'sessions': (0, 8)
+}
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def read_rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        return 0
+
+def count_fds():
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        pass
+    try:
+        import psutil
+        process = psutil.Process()
+        return process.num_handles() if os.name == 'nt' else process.num_fds()
+    except ImportError:
+        return 0
+
+def take_sample(started_at, cycles_done, errors):
+    return {
+        'elapsed': round(time.monotonic() - started_at, 2),
+        'cycles': cycles_done,
+        'errors': errors,
+        'rss_kb': read_rss_kb(),
+        'traced_kb': tracemalloc.get_traced_memory()[0] // 1024,
+        'fds': count_fds(),
+        'threads': threading.active_count(),
+        'sessions': len(tech_unisenac.connected_clients)
+    }
+
+def read_until(sock, marker):
+    data = b""
+    while not data.endswith(marker):
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+def run_cycle(port, cycle, commands):
+    sock = socket.create_connection(('127.0.0.1', port), timeout=10)
+    try:
+        read_until(sock, PROMPT)
+        sock.sendall(f"{commands[cycle % len(commands)]}\r\n".encode('utf-8'))
+        read_until(sock, PROMPT)
+
+        # Varia o encerramento para exercitar os caminhos de erro do servidor
+        if cycle % 10 == 3:
+            return
+        if cycle % 10 == 7:
+            sock.sendall(b"\xff\xfe lixo sem fim de linha")
+            return
+        sock.sendall(b"quit\n")
+        read_until(sock, b"Desconectando...\n")
+    finally:
+        sock.close()
+
+def find_growth(samples):
+    half = len(samples) // 2
+    first, second = samples[:half], samples[half:]
+    problems = []
+    if not first:
+        return problems
+
+    for metric, (ratio, floor) in TOLERANCES.items():
+        before = max(sample[metric] for sample in first)
+        after = max(sample[metric] for sample in second)
+        if after - before > max(before * ratio, floor):
+            problems.append(f"{metric}: {before} -> {after}")
+    return problems
+
+def allocation_growth(snapshot, baseline, limit):
+    # Só linha -> tamanho das que mais cresceram: guardar o snapshot inteiro
+    # até o fim inflaria a própria medição da segunda metade
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    return {stat.traceback[0]: stat.size for stat in snapshot.compare_to(baseline, 'lineno')[:limit] if stat.size_diff > 0}
+
+def steady_growth(baseline, middle, final, limit):
+    # Cresceu do início ao meio e de novo do meio ao fim: candidato a vazamento
+    growing = []
+    for stat in final.compare_to(baseline, 'lineno'):
+        line = stat.traceback[0]
+        if line in middle and stat.size > middle[line] and stat.size_diff > 0:
+            growing.append((stat.size_diff, line, stat.size - stat.size_diff, middle[line], stat.size))
+    growing.sort(key=lambda item: item[0], reverse=True)
+    return growing[:limit]
+
+def write_report(path, samples):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(samples[0].keys()))
+        writer.writeheader()
+        writer.writerows(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test do Tech UniSenac Server")
+    parser.add_argument('--cycles', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--interval', type=float, default=1.0, help="Intervalo entre amostras (s)")
+    parser.add_argument('--commands', default="status,users,whoami,time,ping,uptime,help")
+    parser.add_argument('--report', default="soak_report.csv")
+    parser.add_argument('--top', type=int, default=10, help="Alocações exibidas do tracemalloc")
+    args = parser.parse_args()
+
+    commands = [command.strip() for command in args.commands.split(',') if command.strip()]
+    port = find_free_port()
+
+    tracemalloc.start()
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    with contextlib.redirect_stdout(devnull):
+        server_thread = threading.Thread(target=tech_unisenac.start_server, args=('127.0.0.1', port), name="servidor")
+        server_thread.daemon = True
+        server_thread.start()
+
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    print("ERRO: servidor não iniciou", file=sys.stderr)
+                    return 2
+                time.sleep(0.05)
+
+        # Espera a conexão de verificação ser liberada antes da linha de base
+        time.sleep(0.5)
+        baseline = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        middle = None
+        started_at = time.monotonic()
+        samples = [take_sample(started_at, 0, 0)]
+
+        state = {'next': 0, 'done': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    cycle = state['next']
+                    if cycle >= args.cycles:
+                        return
+                    state['next'] += 1
+                try:
+                    run_cycle(port, cycle, commands)
+                except OSError:
+                    with lock:
+                        state['errors'] += 1
+                with lock:
+                    state['done'] += 1
+
+        workers = [threading.Thread(target=worker, name=f"soak-{i}") for i in range(args.workers)]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+
+        while any(thread.is_alive() for thread in workers):
+            time.sleep(args.interval)
+            samples.append(take_sample(started_at, state['done'], state['errors']))
+            print(f"[{samples[-1]['elapsed']:>7}s] ciclos={state['done']} rss={samples[-1]['rss_kb']}KB "
+                  f"fds={samples[-1]['fds']} threads={samples[-1]['threads']} sessoes={samples[-1]['sessions']}",
+                  file=sys.stderr)
+            if middle is None and state['done'] >= args.cycles // 2:
+                middle = allocation_growth(tracemalloc.take_snapshot(), baseline, max(args.top * 10, 100))
+
+        # Sessões encerradas abruptamente precisam de um instante para serem limpas
+        deadline = time.monotonic() + 10
+        while tech_unisenac.connected_clients and time.monotonic() < deadline:
+            time.sleep(0.1)
+        samples.append(take_sample(started_at, state['done'], state['errors']))
+        final = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    devnull.close()
+
+    write_report(args.report, samples)
+
+    print(f"\nRelatório: {args.report} ({len(samples)} amostras)", file=sys.stderr)
+    print(f"Top {args.top} alocações desde a linha de base:", file=sys.stderr)
+    for stat in final.compare_to(baseline, 'lineno')[:args.top]:
+        print(f"  {stat}", file=sys.stderr)
+
+    growing = steady_growth(baseline, middle or {}, final, args.top)
+    if growing:
+        print("Alocações que cresceram do início ao meio e do meio ao fim (KB):", file=sys.stderr)
+        for _, line, start, mid, end in growing:
+            print(f"  {line.filename}:{line.lineno}: {start / 1024:.1f} -> {mid / 1024:.1f} -> {end / 1024:.1f}", file=sys.stderr)
+
+    problems = find_growth(samples)
+    if samples[-1]['sessions']:
+        problems.append(f"sessions: {samples[-1]['sessions']} sessões não removidas de connected_clients")
+
+    if problems:
+        print("\nFALHA: crescimento sem limite detectado", file=sys.stderr)
+        for problem in problems:
+            print(f"  - {problem}", file=sys.stderr)
+        return 1
+
+    print("\nOK: nenhum crescimento sem limite detectado", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
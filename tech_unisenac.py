@@ -6,8 +6,13 @@ import threading
 import sys
 import time
 import os
+from collections import deque
 from datetime import datetime
 import random
+import traceback
+from relogio import clock, format_seconds
+from opcoes import parse_options
+from cluster import ClusterNode, parse_address
 
 class Colors:
     RESET = '\033[0m'
@@ -23,18 +28,39 @@ server_stats = {
     'total_connections': 0,
     'commands_executed': 0
 }
+server_limits = {
+    'max_clients': 0,  # 0 = sem limite
+    'recv_size': 256,
+    'max_buffer': 8192
+}
+accept_times = deque(maxlen=10000)
+cluster_node = None
 
-def start_server(host='127.0.0.1', port=2323):
+def start_server(host='127.0.0.1', port=2323, admin_port=None, cluster_bind=None, cluster_peers=()):
+    global cluster_node
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     
     try:
         server_socket.bind((host, port))
-        server_socket.listen(10)
+        server_socket.listen(server_limits['max_clients'] or socket.SOMAXCONN)
         
         print_server_banner()
         print(f"Servidor rodando em: {Colors.CYAN}{host}:{port}{Colors.RESET}")
         print(f"Iniciado em: {Colors.GREEN}{server_start_time.strftime('%d/%m/%Y %H:%M:%S')}{Colors.RESET}")
+        if admin_port:
+            try:
+                start_admin_server(admin_port)
+                print(f"Console admin em: {Colors.CYAN}127.0.0.1:{admin_port}{Colors.RESET}")
+            except OSError as e:
+                print(f"{Colors.RED}[ERRO]{Colors.RESET} Console admin indisponível: {e}")
+        if cluster_bind:
+            try:
+                cluster_node = ClusterNode(f"{host}:{port}", cluster_bind, cluster_peers,
+                                           get_local_sessions, get_local_stats).start()
+                print(f"Cluster em: {Colors.CYAN}{cluster_bind[0]}:{cluster_bind[1]}{Colors.RESET} ({len(cluster_node.peers)} peers)")
+            except OSError as e:
+                print(f"{Colors.RED}[ERRO]{Colors.RESET} Modo cluster indisponível: {e}")
         print("=" * 50)
         print("Pressione Ctrl+C para parar o servidor")
         print("=" * 50)
@@ -42,18 +68,35 @@ def start_server(host='127.0.0.1', port=2323):
         while True:
             try:
                 client_socket, client_address = server_socket.accept()
+                
+                if server_limits['max_clients'] and len(connected_clients) >= server_limits['max_clients']:
+                    print(f"{Colors.YELLOW}[RECUSADA]{Colors.RESET} {client_address[0]}:{client_address[1]} - limite de clientes atingido")
+                    try:
+                        client_socket.send("Servidor cheio. Tente novamente mais tarde.\n".encode('utf-8'))
+                    except OSError:
+                        pass
+                    client_socket.close()
+                    continue
+                
                 server_stats['total_connections'] += 1
+                accept_times.append(time.monotonic())
                 
                 print(f"{Colors.GREEN}[NOVA CONEXAO]{Colors.RESET} {client_address[0]}:{client_address[1]}")
                 
                 connected_clients[client_address] = {
                     'socket': client_socket,
-                    'connected_at': datetime.now(),
+                    'connected_at': clock.now,
                     'username': f"user_{server_stats['total_connections']}",
-                    'commands_count': 0
+                    'commands_count': 0,
+                    'buffer_size': 0,
+                    'thread_id': None
                 }
                 
-                client_thread = threading.Thread(target=handle_client, args=(client_socket, client_address))
+                client_thread = threading.Thread(
+                    target=handle_client,
+                    args=(client_socket, client_address),
+                    name=f"cliente-{client_address[0]}:{client_address[1]}"
+                )
                 client_thread.daemon = True
                 client_thread.start()
                 
@@ -63,6 +106,8 @@ def start_server(host='127.0.0.1', port=2323):
     except Exception as e:
         print(f"{Colors.RED}[ERRO CRITICO]{Colors.RESET} Erro no servidor: {e}")
     finally:
+        if cluster_node:
+            cluster_node.stop()
         server_socket.close()
 
 def print_server_banner():
@@ -77,6 +122,7 @@ def print_server_banner():
 def handle_client(client_socket, client_address):
     try:
         client_info = connected_clients[client_address]
+        client_info['thread_id'] = threading.get_ident()
         
         welcome = get_welcome_message(client_info)
         client_socket.send(welcome.encode('utf-8'))
@@ -86,13 +132,17 @@ def handle_client(client_socket, client_address):
         buffer = ""
         while True:
             try:
-                data = client_socket.recv(256).decode('utf-8', errors='ignore')
+                data = client_socket.recv(server_limits['recv_size']).decode('utf-8', errors='ignore')
                 
                 if not data:
                     break
                 
                 buffer += data
                 
+                if len(buffer) > server_limits['max_buffer'] and '\n' not in buffer and '\r' not in buffer:
+                    buffer = ""
+                    client_socket.send(f"{Colors.RED}[ERRO]{Colors.RESET} Linha muito longa, descartada.\n\nDigite um comando: ".encode('utf-8'))
+                
                 while '\n' in buffer or '\r' in buffer:
                     if '\r\n' in buffer:
                         command, buffer = buffer.split('\r\n', 1)
@@ -118,6 +168,8 @@ def handle_client(client_socket, client_address):
                     response += "Digite um comando: "
                     client_socket.send(response.encode('utf-8'))
                 
+                client_info['buffer_size'] = len(buffer)
+                
             except socket.timeout:
                 continue
             except Exception as e:
@@ -140,7 +192,7 @@ def handle_client(client_socket, client_address):
 
 def get_welcome_message(client_info):
     username = client_info['username']
-    current_time = datetime.now().strftime('%H:%M:%S')
+    current_time = clock.time_str
     
     return f"""
 {Colors.CYAN}+================================================+
@@ -219,19 +271,33 @@ Uptime: {uptime}
 Usuários Conectados: {users}
 Conexões Totais: {server_stats['total_connections']}
 Comandos Executados: {server_stats['commands_executed']}
+{cmd_cluster_status() if cluster_node else ''}
+"""
 
+def cmd_cluster_status():
+    totals = cluster_node.cluster_stats()
+    return f"""
+{Colors.GREEN}[STATUS] CLUSTER{Colors.RESET}
+Nós Ativos: {totals['nodes']}
+Usuários no Cluster: {totals.get('users', 0)}
+Conexões Totais: {totals.get('total_connections', 0)}
+Comandos Executados: {totals.get('commands_executed', 0)}
 """
 
 def cmd_users():
+    if cluster_node:
+        return cmd_cluster_users()
+    
     if not connected_clients:
         return f"{Colors.YELLOW}[USERS] Nenhum usuário conectado.{Colors.RESET}\n\n"
     
     result = f"{Colors.CYAN}[USERS] USUÁRIOS CONECTADOS{Colors.RESET}\n\n"
+    now = clock.now
     
     for i, (addr, info) in enumerate(connected_clients.items(), 1):
         username = info['username']
         connect_time = info['connected_at']
-        duration = datetime.now() - connect_time
+        duration = now - connect_time
         commands = info.get('commands_count', 0)
         
         result += f"{i}. {username} - {addr[0]} - {format_duration(duration)} - {commands} cmds\n"
@@ -239,6 +305,40 @@ def cmd_users():
     result += f"\nTotal: {len(connected_clients)} usuários\n\n"
     return result
 
+def cmd_cluster_users():
+    sessions = cluster_node.cluster_sessions()
+    if not sessions:
+        return f"{Colors.YELLOW}[USERS] Nenhum usuário conectado no cluster.{Colors.RESET}\n\n"
+    
+    result = f"{Colors.CYAN}[USERS] USUÁRIOS CONECTADOS (CLUSTER){Colors.RESET}\n\n"
+    now = clock.now.timestamp()
+    
+    for i, (node, info) in enumerate(sessions, 1):
+        duration = format_seconds(max(int(now - info['connected_at']), 0))
+        result += f"{i}. {info['username']} - {info['ip']} - {duration} - {info['commands']} cmds - nó {node}\n"
+    
+    result += f"\nTotal: {len(sessions)} usuários em {cluster_node.cluster_stats()['nodes']} nós\n\n"
+    return result
+
+def get_local_sessions():
+    return {
+        f"{addr[0]}:{addr[1]}": {
+            'username': info['username'],
+            'ip': addr[0],
+            'connected_at': info['connected_at'].timestamp(),
+            'commands': info['commands_count']
+        }
+        for addr, info in list(connected_clients.items())
+    }
+
+def get_local_stats():
+    return {
+        'users': len(connected_clients),
+        'total_connections': server_stats['total_connections'],
+        'commands_executed': server_stats['commands_executed'],
+        'uptime': int((clock.now - server_start_time).total_seconds())
+    }
+
 def cmd_ping(args):
     host = args[0] if args else 'google.com'
     latency = random.randint(10, 100)
@@ -252,11 +352,10 @@ Status: OK
 """
 
 def cmd_time():
-    now = datetime.now()
     return f"""
 {Colors.BLUE}[TIME] DATA E HORA{Colors.RESET}
-Data: {now.strftime('%d/%m/%Y')}
-Hora: {now.strftime('%H:%M:%S')}
+Data: {clock.date_str}
+Hora: {clock.time_str}
 
 """
 
@@ -266,7 +365,7 @@ def cmd_whoami(client_address):
 {Colors.BLUE}[WHOAMI] SUAS INFORMAÇÕES{Colors.RESET}
 Usuário: {client_info['username']}
 IP: {client_address[0]}:{client_address[1]}
-Conectado há: {format_duration(datetime.now() - client_info['connected_at'])}
+Conectado há: {format_duration(clock.now - client_info['connected_at'])}
 Comandos executados: {client_info['commands_count']}
 
 """
@@ -275,7 +374,7 @@ def cmd_uptime():
     return f"{Colors.CYAN}[UPTIME] Servidor ativo há: {calculate_uptime()}{Colors.RESET}\n\n"
 
 def get_goodbye_message(client_info):
-    session_time = datetime.now() - client_info['connected_at']
+    session_time = clock.now - client_info['connected_at']
     username = client_info['username']
     commands = client_info['commands_count']
     
@@ -294,27 +393,212 @@ Desconectando...
 """
 
 def calculate_uptime():
-    uptime = datetime.now() - server_start_time
+    uptime = clock.now - server_start_time
     return format_duration(uptime)
 
 def format_duration(duration):
-    total_seconds = int(duration.total_seconds())
+    return format_seconds(max(int(duration.total_seconds()), 0))
+
+def get_output_queue_depth(client_socket):
+    # Bytes ainda na fila de envio do kernel (Linux); None quando indisponível
+    try:
+        import fcntl
+        import termios
+        import struct
+        raw = fcntl.ioctl(client_socket.fileno(), termios.TIOCOUTQ, struct.pack('I', 0))
+        return struct.unpack('I', raw)[0]
+    except Exception:
+        return None
+
+def get_accept_rate(window):
+    now = time.monotonic()
+    count = 0
+    for accepted_at in reversed(accept_times):
+        if now - accepted_at > window:
+            break
+        count += 1
+    return count / window
+
+def find_session(target):
+    for addr, info in list(connected_clients.items()):
+        if target in (info['username'], f"{addr[0]}:{addr[1]}"):
+            return addr, info
+    return None, None
+
+def start_admin_server(port):
+    admin_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    admin_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    admin_socket.bind(('127.0.0.1', port))
+    admin_socket.listen(2)
     
-    days, remainder = divmod(total_seconds, 86400)
-    hours, remainder = divmod(remainder, 3600)
-    minutes, seconds = divmod(remainder, 60)
+    admin_thread = threading.Thread(target=accept_admin_sessions, args=(admin_socket,), name="admin")
+    admin_thread.daemon = True
+    admin_thread.start()
+    return admin_socket
+
+def accept_admin_sessions(admin_socket):
+    while True:
+        try:
+            conn, addr = admin_socket.accept()
+        except OSError:
+            break
+        
+        print(f"{Colors.CYAN}[ADMIN]{Colors.RESET} Sessão administrativa de {addr[0]}:{addr[1]}")
+        session_thread = threading.Thread(target=handle_admin, args=(conn,), name=f"admin-{addr[0]}:{addr[1]}")
+        session_thread.daemon = True
+        session_thread.start()
+
+def handle_admin(conn):
+    try:
+        conn.send(f"{Colors.CYAN}[ADMIN] CONSOLE TECH UNISENAC{Colors.RESET}\nDigite 'help' para ver os comandos.\n\nadmin> ".encode('utf-8'))
+        
+        buffer = ""
+        while True:
+            data = conn.recv(1024).decode('utf-8', errors='ignore')
+            if not data:
+                break
+            
+            buffer += data
+            while '\n' in buffer:
+                line, buffer = buffer.split('\n', 1)
+                line = line.strip()
+                
+                if not line:
+                    conn.send("admin> ".encode('utf-8'))
+                    continue
+                
+                if line.lower() in ['quit', 'exit', 'sair']:
+                    conn.send("Encerrando console admin.\n".encode('utf-8'))
+                    return
+                
+                response = process_admin_command(line)
+                conn.send((response + "admin> ").encode('utf-8'))
     
-    parts = []
-    if days > 0:
-        parts.append(f"{days}d")
-    if hours > 0:
-        parts.append(f"{hours}h")
-    if minutes > 0:
-        parts.append(f"{minutes}m")
-    if seconds > 0 or not parts:
-        parts.append(f"{seconds}s")
+    except Exception as e:
+        print(f"{Colors.YELLOW}[ADMIN]{Colors.RESET} Erro na sessão administrativa: {e}")
+    finally:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+def process_admin_command(line):
+    parts = line.split()
+    cmd = parts[0].lower()
+    args = parts[1:]
+    
+    if cmd == 'help':
+        return admin_help()
+    elif cmd == 'sessions':
+        return admin_sessions()
+    elif cmd == 'stacks':
+        return admin_stacks()
+    elif cmd == 'rates':
+        return admin_rates()
+    elif cmd == 'kick':
+        return admin_kick(args)
+    elif cmd == 'limits':
+        return admin_limits()
+    elif cmd == 'set':
+        return admin_set(args)
+    else:
+        return f"Comando admin '{cmd}' não reconhecido.\n\n"
+
+def admin_help():
+    return f"""
+{Colors.GREEN}[ADMIN] COMANDOS{Colors.RESET}
+* sessions              - Sessões com buffer e fila de saída
+* stacks                - Pilhas das threads do servidor
+* rates                 - Taxa de conexões aceitas
+* kick <usuario|ip:porta> - Encerra uma sessão
+* limits                - Limites atuais
+* set <limite> <valor>  - Altera um limite em tempo real
+* quit                  - Sair do console
+
+"""
+
+def admin_sessions():
+    sessions = list(connected_clients.items())
+    if not sessions:
+        return "[SESSIONS] Nenhuma sessão ativa.\n\n"
     
-    return " ".join(parts)
+    result = f"{Colors.CYAN}[SESSIONS] {len(sessions)} SESSÕES{Colors.RESET}\n"
+    result += f"{'USUARIO':<15} {'ENDERECO':<22} {'TEMPO':<12} {'CMDS':>6} {'BUFFER':>8} {'SAIDA':>8}\n"
+    for addr, info in sessions:
+        queue_depth = get_output_queue_depth(info['socket'])
+        duration = format_duration(clock.now - info['connected_at'])
+        result += (
+            f"{info['username']:<15} {addr[0] + ':' + str(addr[1]):<22} {duration:<12} "
+            f"{info['commands_count']:>6} {info['buffer_size']:>8} {'-' if queue_depth is None else queue_depth:>8}\n"
+        )
+    return result + "\n"
+
+def admin_stacks():
+    threads = {thread.ident: thread.name for thread in threading.enumerate()}
+    owners = {info['thread_id']: info['username'] for info in list(connected_clients.values())}
+    
+    result = f"{Colors.CYAN}[STACKS] {len(threads)} THREADS{Colors.RESET}\n"
+    for thread_id, frame in sys._current_frames().items():
+        name = threads.get(thread_id, 'desconhecida')
+        if thread_id in owners:
+            name += f" ({owners[thread_id]})"
+        result += f"\n--- {name} [{thread_id}] ---\n"
+        result += "".join(traceback.format_stack(frame))
+    return result + "\n"
+
+def admin_rates():
+    return f"""
+{Colors.CYAN}[RATES] CONEXÕES ACEITAS{Colors.RESET}
+Último 1s:   {get_accept_rate(1):.2f}/s
+Últimos 10s: {get_accept_rate(10):.2f}/s
+Últimos 60s: {get_accept_rate(60):.2f}/s
+Total aceitas: {server_stats['total_connections']}
+
+"""
+
+def admin_kick(args):
+    if not args:
+        return "Uso: kick <usuario|ip:porta>\n\n"
+    
+    addr, info = find_session(args[0])
+    if info is None:
+        return f"Sessão '{args[0]}' não encontrada.\n\n"
+    
+    try:
+        info['socket'].send(f"\n{Colors.RED}Sessão encerrada pelo administrador.{Colors.RESET}\n".encode('utf-8'))
+    except OSError:
+        pass
+    try:
+        info['socket'].shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    
+    return f"Sessão {info['username']} ({addr[0]}:{addr[1]}) encerrada.\n\n"
+
+def admin_limits():
+    result = f"{Colors.CYAN}[LIMITS] LIMITES ATUAIS{Colors.RESET}\n"
+    for name, value in server_limits.items():
+        result += f"{name:<12} = {value}\n"
+    return result + "\n"
+
+def admin_set(args):
+    if len(args) != 2:
+        return "Uso: set <limite> <valor>\n\n"
+    
+    name, value = args
+    if name not in server_limits:
+        return f"Limite '{name}' desconhecido. Use 'limits' para ver as opções.\n\n"
+    
+    try:
+        value = int(value)
+    except ValueError:
+        return "ERRO: Valor deve ser um número.\n\n"
+    
+    if value < 0 or (value == 0 and name != 'max_clients'):
+        return "ERRO: Valor deve ser positivo (max_clients aceita 0 = sem limite).\n\n"
+    
+    server_limits[name] = value
+    return f"{name} alterado para {value}.\n\n"
 
 def show_main_menu():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -325,13 +609,33 @@ def show_main_menu():
     print()
 
 def main():
-    if len(sys.argv) >= 2:
-        host = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1'
+    args, options = parse_options(sys.argv[1:])
+    
+    admin_port = None
+    if 'admin-port' in options:
+        try:
+            admin_port = int(options['admin-port'])
+        except ValueError:
+            print("ERRO: Porta admin deve ser um número.")
+            return
+    
+    cluster_bind = None
+    cluster_peers = []
+    if 'cluster-bind' in options:
+        try:
+            cluster_bind = parse_address(options['cluster-bind'])
+            cluster_peers = [parse_address(peer) for peer in options.get('cluster-peers', '').split(',') if peer.strip()]
+        except ValueError:
+            print("ERRO: Endereços do cluster devem estar no formato host:porta.")
+            return
+    
+    if len(args) >= 1:
+        host = args[0]
         port = 2323
         
-        if len(sys.argv) > 2:
+        if len(args) > 1:
             try:
-                port = int(sys.argv[2])
+                port = int(args[1])
             except ValueError:
                 print("ERRO: Porta deve ser um número.")
                 return
@@ -340,7 +644,7 @@ def main():
         print()
         
         try:
-            start_server(host, port)
+            start_server(host, port, admin_port, cluster_bind, cluster_peers)
         except KeyboardInterrupt:
             print(f"\n\nServidor parado pelo usuário.")
             print("Até logo!")
@@ -364,7 +668,7 @@ def main():
         time.sleep(1)
         
         try:
-            start_server(host, port)
+            start_server(host, port, admin_port, cluster_bind, cluster_peers)
         except KeyboardInterrupt:
             print(f"\n\nServidor parado pelo usuário.")
             print("Até logo!")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from calculadora import Calculator, CalcError, MAX_INT_BITS
+
+@pytest.mark.parametrize('expression', [
+    '(9**9999)**9999',
+    '(9**999)**999',
+    '((2**100)**100)**100',
+    '2**(2**20)',
+    '(9**4000) * (9**4000)',
+    'factorial(1000) * factorial(1000)'
+])
+def test_rejects_huge_integer_results(expression):
+    with pytest.raises(CalcError):
+        Calculator().evaluate(expression)
+
+def test_keeps_results_within_budget():
+    calculator = Calculator()
+    assert calculator.evaluate('2**10')[1] == 1024
+    assert calculator.evaluate('(2**10)**10')[1] == 2 ** 100
+    assert calculator.evaluate('2**-2')[1] == 0.25
+    assert calculator.evaluate('2.5**3')[1] == 15.625
+    _, result = calculator.evaluate('(9**1000)**4')
+    assert result.bit_length() <= MAX_INT_BITS
+    str(result)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import tech_unisenac
+from opcoes import parse_options
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture(scope='module')
+def server_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    thread = threading.Thread(target=tech_unisenac.start_server, args=('127.0.0.1', port), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return port
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def run_client(args, stdin):
+    return subprocess.run([sys.executable, os.path.join(HERE, 'cliente_rich.py')] + args, input=stdin,
+                          capture_output=True, text=True, timeout=30, cwd=HERE)
+
+def test_parse_options_bare_flags():
+    assert parse_options(['--port', '23456', '--batch']) == ([], {'port': '23456', 'batch': ''})
+    assert parse_options(['--batch', '--port', '1']) == ([], {'batch': '', 'port': '1'})
+    assert parse_options(['--batch', 'h', '2'], flags=('batch',)) == (['h', '2'], {'batch': ''})
+    assert parse_options(['h', '--batch=x.txt']) == (['h'], {'batch': 'x.txt'})
+
+@pytest.mark.parametrize('layout', [
+    lambda port: ['--port', str(port), '--batch'],
+    lambda port: ['--batch', '127.0.0.1', str(port)],
+    lambda port: ['127.0.0.1', str(port), '--batch'],
+    lambda port: ['127.0.0.1', str(port), '--batch', '-']
+])
+def test_batch_reads_stdin(server_port, layout):
+    result = run_client(layout(server_port) + ['--format', 'jsonl'], "status\nwhoami\n")
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 2
+    assert '"command": "status"' in lines[0] and '"ok": true' in lines[0]
+
+def test_batch_reads_command_file(server_port, tmp_path):
+    commands = tmp_path / 'comandos.txt'
+    commands.write_text("# comentario\ntime\n", encoding='utf-8')
+    result = run_client(['127.0.0.1', str(server_port), '--batch', str(commands)], "")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip()
+
+def test_batch_rejects_extra_arguments(server_port):
+    result = run_client(['127.0.0.1', str(server_port), '--batch', 'nao_existe.txt'], "")
+    assert result.returncode == 2
+    assert 'nao_existe.txt' in result.stderr
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from cliente_historico import SessionRecorder
+
+def test_idle_recorder_does_not_rotate(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), max_seconds=0.05, flush_interval=0.02, compress=True).start()
+    time.sleep(0.5)
+    recorder.stop()
+    assert len(recorder.segments) == 1
+    assert os.listdir(tmp_path) == [os.path.basename(recorder.segments[0])]
+
+def test_recorder_rotates_after_writes(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), max_seconds=0.05, flush_interval=0.02).start()
+    recorder.write("primeira")
+    time.sleep(0.3)
+    recorder.write("segunda")
+    time.sleep(0.3)
+    recorder.stop()
+    contents = [open(path, encoding='utf-8').read() for path in recorder.segments]
+    assert "".join(contents) == "primeira\nsegunda\n"
+    assert [text for text in contents if text] == ["primeira\n", "segunda\n"]
+    assert recorder.lines == 2
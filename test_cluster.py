@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import socket
+import time
+
+from cluster import ClusterNode
+
+def make_node(node_id='a', sessions=None, address=('127.0.0.1', 0), peers=(), **kwargs):
+    return ClusterNode(node_id, address, list(peers), lambda: dict(sessions or {}), lambda: {'commands': 1}, **kwargs)
+
+def full(snapshot, sessions, part=0, parts=1, incarnation=1):
+    return {'node': 'b', 'incarnation': incarnation, 'type': 'full', 'snapshot': snapshot,
+            'part': part, 'parts': parts, 'sessions': sessions, 'stats': {'commands': snapshot}}
+
+def delta(seq, sessions=None, removed=(), incarnation=1):
+    return {'node': 'b', 'incarnation': incarnation, 'type': 'delta', 'seq': seq,
+            'sessions': sessions or {}, 'removed': list(removed), 'stats': {'commands': seq}}
+
+def sessions_of(node):
+    return node.view['b']['sessions']
+
+def test_late_delta_is_dropped():
+    node = make_node()
+    node.merge(delta(1, {'s1': 1, 's2': 1}))
+    node.merge(delta(3, removed=['s1']))
+    node.merge(delta(2, {'s1': 1}))
+    assert sessions_of(node) == {'s2': 1}
+    assert node.view['b']['seq'] == 3
+    assert node.view['b']['stats'] == {'commands': 3}
+
+def test_late_full_snapshot_is_dropped():
+    node = make_node()
+    node.merge(full(1, {'s1': 1}))
+    node.merge(delta(2, removed=['s1']))
+    node.merge(full(1, {'s1': 1}))
+    assert sessions_of(node) == {}
+    assert node.view['b']['seq'] == 2
+
+def test_restarted_node_starts_a_new_sequence():
+    node = make_node()
+    node.merge(delta(50, {'old': 1}))
+    node.merge(full(1, {'new': 1}, incarnation=2))
+    assert sessions_of(node) == {'new': 1}
+    node.merge(delta(2, {'more': 1}, incarnation=2))
+    assert sessions_of(node) == {'new': 1, 'more': 1}
+    # Datagrama atrasado da execução anterior
+    node.merge(delta(51, {'old': 1}, incarnation=1))
+    assert 'old' not in sessions_of(node)
+
+def test_multipart_snapshot_does_not_touch_published_entry():
+    node = make_node()
+    node.merge(delta(1, {'s1': 1}))
+    published = node.view['b']
+    before = dict(published)
+    node.merge(full(2, {'s2': 1}, part=0, parts=2))
+    assert published == before
+    assert sessions_of(node) == {'s1': 1}
+    node.merge(full(2, {'s3': 1}, part=1, parts=2))
+    assert sessions_of(node) == {'s2': 1, 's3': 1}
+    assert published['sessions'] == {'s1': 1}
+
+def free_udp_address():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()
+
+def test_two_instances_on_one_machine():
+    first, second = free_udp_address(), free_udp_address()
+    peers = [first, second]
+    nodes = [
+        make_node('n1', {'x': {'user': 'ana'}}, first, peers, interval=0.05, full_every=3).start(),
+        make_node('n2', {'y': {'user': 'bia'}}, second, peers, interval=0.05, full_every=3).start()
+    ]
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if all(len(node.cluster_sessions()) == 2 for node in nodes):
+                break
+            time.sleep(0.05)
+        for node in nodes:
+            assert sorted(info['user'] for _, info in node.cluster_sessions()) == ['ana', 'bia']
+    finally:
+        for node in nodes:
+            node.stop()